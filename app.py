@@ -4,15 +4,17 @@ import argparse
 import logging
 import midi
 
-from interface import (CLInterface, TkInterface)
-from input.keyboardInput import (KeyboardInput, EVT_KEY, EVT_KEY_PRESSED, EVT_KEY_RELEASED)
+import interface
+from interface import DEFAULT_FPS
+from input.keyboardInput import (KeyboardInput, EVT_KEY_PRESSED, EVT_KEY_RELEASED)
+from input.midiInput import MidiStreamInput
 from synth import (EventQueue, Event)
 from synth import Synth
 
 LOGGER_NAME = 'app'
-interface_map = {
-  'cli': CLInterface,
-  'tk': TkInterface
+interface_map = { # Names in the interface package, which only imports the Tk one when it is used
+  'cli': 'CLInterface',
+  'tk': 'TkInterface'
 }
 
 EVT_SYS = 'sys_'
@@ -41,26 +43,62 @@ keyboard_note_table = {
   "-": ("G#", 5),
 }
 
-event_type_midi_action = {
-  EVT_KEY_PRESSED: midi.note_on,
-  EVT_KEY_RELEASED: midi.note_off
+def compile_key_messages(note_table, velocity=127):
+  """ Builds the (note on, note off) messages of every key once, so key presses need no midi work. """
+  return {
+    key: (midi.note_on(note, octave, velocity), midi.note_off(note, octave, velocity))
+    for key, (note, octave) in note_table.items()
+  }
+
+key_messages = compile_key_messages(keyboard_note_table)
+
+# Which of the key messages each key event plays
+event_type_message = {
+  EVT_KEY_PRESSED: 0,
+  EVT_KEY_RELEASED: 1
 }
 
 class App(object):
-  def __init__(self, Iface, *args, **kwargs):
+  def __init__(self, Iface, *args, midi_file=None, midi_in=None, trace=None, fps=DEFAULT_FPS, **kwargs):
     super(App).__init__(*args, **kwargs)
     self.stop = False
     self.log = logging.getLogger(LOGGER_NAME)
+    self.midi_file = midi_file
+    self.midi_in = midi_in
+    self.midi_input = None
+    self.trace = trace
+    self.fps = fps
+    self.startup = {} # Init phase -> seconds it took
 
     self.log.debug('Initializing Input...')
-    self._init_input()
+    self._timed(self._init_input)
     
     self.log.debug('Initializing synth...')
-    self._init_synth()
+    self._timed(self._init_synth)
+
+    if self.midi_in:
+      self.log.debug(f'Reading midi from {self.midi_in}...')
+      self._timed(self._init_midi_input)
+
+    if self.midi_file:
+      self.log.debug(f'Playing {self.midi_file}...')
+      self._timed(self._init_playback)
     
     self.log.debug('Initializing Interface...')
     self.IfaceType = Iface
-    self._init_interface()
+    self._timed(self._init_interface)
+
+    self._report_startup()
+    self.interface.start(exit_action=self.exit)
+
+  def _timed(self, init):
+    start = time.perf_counter()
+    init()
+    self.startup[init.__name__] = time.perf_counter() - start
+
+  def _report_startup(self):
+    phases = ', '.join(f'{phase} {seconds * 1000:.1f}ms' for phase, seconds in self.startup.items())
+    self.log.info(f'Started in {sum(self.startup.values()) * 1000:.1f}ms: {phases}')
 
   def _init_input(self):
     self.input_queue = EventQueue()
@@ -78,16 +116,14 @@ class App(object):
 
       item = event.item
 
-      if event.type.startswith(EVT_SYS):
+      if event.type == EVT_SYS:
         if item == EXIT_ITEM:
           self._terminate()
       
-      if event.type.startswith(EVT_KEY):
-        if item in keyboard_note_table:
-          note, octave = keyboard_note_table[item]
-
+      if event.type in event_type_message:
+        if item in key_messages:
           new_event = Event(
-            event_type_midi_action[event.type](note, octave, 127),
+            key_messages[item][event_type_message[event.type]],
             midi.EVT_MIDI,
             ancestor=event,
             timestamp=time.time()
@@ -108,23 +144,40 @@ class App(object):
     self.log.debug('Exiting input Thread loop...')
 
   def _init_interface(self):
-    self.interface = self.IfaceType(self.synth, log=self.log)
-    self.interface.start(exit_action=self.exit)
+    self.interface = self.IfaceType(self.synth, log=self.log, fps=self.fps)
   
   def _init_synth(self):
-    self.synth = Synth(log=self.log)
+    self.synth = Synth(log=self.log, trace=self.trace is not None)
     self.synth_queue = self.synth.input_queue
 
+    # Note keys skip the queues and go straight to the synth's scheduler
+    self.input.route(key_messages, self.synth.schedule)
+
+  def _init_midi_input(self):
+    self.midi_input = MidiStreamInput(self.synth_queue, self.midi_in)
+    self.midi_input.start()
+
+  def _init_playback(self):
+    midi_file = midi.MidiFile(self.midi_file)
+    self.playback_thread = threading.Thread(target=midi_file.play, args=(self.synth_queue,), daemon=True)
+    self.playback_thread.start()
+
   def _terminate(self):
     self.log.debug("Terminating app...")
     self.stop = True
     
     self.log.debug("Terminating Input...")
     self.input.stop()
+    if self.midi_input:
+      self.midi_input.stop()
 
     self.log.debug("Terminating Synth...")
     self.synth.terminate()
 
+    if self.trace:
+      self.log.debug(f"Writing latency trace to {self.trace}...")
+      self.synth.tracer.export(self.trace, {'device_latency_ms': self.synth.player.stream.latency * 1000})
+
     if threading.get_ident() != self.input_thread.ident:
       self.log.debug('Stopping input Thread...')
       self.input_thread.join()
@@ -144,11 +197,11 @@ def main():
   log.debug(f'Using {Iface} as the interface type')
   
   log.debug(f'Initializing App...')
-  App(Iface)
+  App(Iface, midi_file=args.play, midi_in=args.midi_in, trace=args.trace, fps=args.fps)
   log.debug(f'Bye ;)')
 
 def get_interface_type(args):
-  return interface_map[args.interface]
+  return getattr(interface, interface_map[args.interface])
 
 def init_log(args):
   if args.debug:
@@ -163,6 +216,13 @@ def init_log(args):
 
   return log
 
+def positive_int(value):
+  number = int(value)
+  if number <= 0:
+    raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+
+  return number
+
 def parse_args():
   parser = argparse.ArgumentParser(description="I'm a poor synth")
   
@@ -177,6 +237,27 @@ def parse_args():
     choices=interface_map.keys(),
     default='tk'
   )
+  parser.add_argument(
+    '--play',
+    help="standard midi file to play",
+    metavar='FILE'
+  )
+  parser.add_argument(
+    '--midi-in',
+    help="reads raw midi bytes from a fifo or file path, from unix:PATH socket clients, or from - (stdin)",
+    metavar='SOURCE'
+  )
+  parser.add_argument(
+    '--trace',
+    help="traces key to audio latency per stage and writes it as json to FILE on exit",
+    metavar='FILE'
+  )
+  parser.add_argument(
+    '--fps',
+    help="maximum frame rate of the visualizations",
+    type=positive_int,
+    default=DEFAULT_FPS
+  )
 
   return parser.parse_args()
 
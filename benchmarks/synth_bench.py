@@ -0,0 +1,150 @@
+""" Benchmarks for the synth render path.
+
+Run from the repository root:
+
+  $ python -m benchmarks.synth_bench --voices 1 8 64 --oscilators 4 --block-sizes 256 1024 --output bench.json
+
+Every case renders a number of blocks and reports blocks/sec, the real-time factor (seconds of audio rendered per second of CPU), the p50/p99 block render time and the memory allocated per block (peak traced by tracemalloc). Results are saved as JSON so runs can be compared with --compare. """
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from synth.backends import NullBackend
+from synth.oscilator import Oscilator
+from synth.player import Player
+from synth.sampler import Sampler
+from synth.waveform import WAVEFORMS
+
+def create_oscilators(count, wavetable=True):
+  waveforms = itertools.cycle(WAVEFORMS.items())
+  return [Oscilator(waveform, name=name, wavetable=wavetable) for name, waveform in itertools.islice(waveforms, count)]
+
+def measure(render, block_size, sample_rate, blocks):
+  """ Calls render() blocks times. Each call must produce one block of block_size samples. """
+  render() # Warm up caches (wavetables, ramps)
+
+  timings = np.empty(blocks)
+  for i in range(blocks):
+    start = time.perf_counter()
+    render()
+    timings[i] = time.perf_counter() - start
+
+  tracemalloc.start()
+  allocated = np.empty(min(blocks, 20))
+  for i in range(len(allocated)):
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    render()
+    _, peak = tracemalloc.get_traced_memory()
+    allocated[i] = peak - before
+  tracemalloc.stop()
+
+  total = timings.sum()
+  deadline = block_size / sample_rate
+
+  return {
+    'blocks_per_sec': blocks / total,
+    'real_time_factor': blocks * deadline / total,
+    'p50_ms': np.percentile(timings, 50) * 1000,
+    'p99_ms': np.percentile(timings, 99) * 1000,
+    'deadline_ms': deadline * 1000,
+    'alloc_bytes_per_block': float(np.median(allocated)),
+  }
+
+def bench_sampler(voices, oscilators, block_size, sample_rate, blocks, batched):
+  sampler = Sampler(sample_rate=sample_rate, sample_size=block_size, num_voices=voices, batched=batched)
+  bank = create_oscilators(oscilators)
+  for i in range(voices):
+    sampler.allocate_voice((bank, 110.0 * 2 ** (i / 12)))
+
+  return measure(sampler.get_master, block_size, sample_rate, blocks)
+
+def bench_oscilator(waveform_name, wavetable, block_size, sample_rate, blocks):
+  oscilator = Oscilator(WAVEFORMS[waveform_name], wavetable=wavetable)
+  t = np.arange(block_size) / sample_rate
+
+  return measure(lambda: oscilator.evaluate(t, 440.0), block_size, sample_rate, blocks)
+
+def bench_normalize(block_size, sample_rate, blocks):
+  player = Player(backend=NullBackend(realtime=False))
+  sample = np.sin(np.arange(block_size) / 10.0)
+
+  try:
+    return measure(lambda: player.normalize(sample), block_size, sample_rate, blocks)
+  finally:
+    player.terminate()
+
+def run(args):
+  results = []
+
+  def record(name, params, result):
+    results.append(dict(name=name, params=params, **result))
+    print(f"{name:<24} {json.dumps(params):<80} {result['real_time_factor']:>10.1f}x RT  p50 {result['p50_ms']:.3f}ms  p99 {result['p99_ms']:.3f}ms  {result['alloc_bytes_per_block']:.0f}B/block")
+
+  for sample_rate, block_size in itertools.product(args.sample_rates, args.block_sizes):
+    for voices, oscilators, batched in itertools.product(args.voices, args.oscilators, (True, False)):
+      params = dict(voices=voices, oscilators=oscilators, block_size=block_size, sample_rate=sample_rate, batched=batched)
+      record('Sampler.get_master', params, bench_sampler(voices, oscilators, block_size, sample_rate, args.blocks, batched))
+
+    for waveform_name, wavetable in itertools.product(WAVEFORMS, (True, False)):
+      params = dict(waveform=waveform_name, wavetable=wavetable, block_size=block_size, sample_rate=sample_rate)
+      record('Oscilator.evaluate', params, bench_oscilator(waveform_name, wavetable, block_size, sample_rate, args.blocks))
+
+    params = dict(block_size=block_size, sample_rate=sample_rate)
+    record('Player.normalize', params, bench_normalize(block_size, sample_rate, args.blocks))
+
+  return results
+
+def compare(results, baseline_path):
+  with open(baseline_path) as baseline_file:
+    baseline = {(r['name'], json.dumps(r['params'], sort_keys=True)): r for r in json.load(baseline_file)['results']}
+
+  print('\nChange in p50 block render time against', baseline_path)
+  for result in results:
+    old = baseline.get((result['name'], json.dumps(result['params'], sort_keys=True)))
+    if old:
+      change = (result['p50_ms'] / old['p50_ms'] - 1) * 100
+      print(f"{result['name']:<24} {json.dumps(result['params']):<80} {change:+.1f}%")
+
+def parse_args():
+  parser = argparse.ArgumentParser(description="Benchmarks the synth render path")
+
+  parser.add_argument('--voices', type=int, nargs='+', default=[1, 8, 64])
+  parser.add_argument('--oscilators', type=int, nargs='+', default=[1, 4])
+  parser.add_argument('--block-sizes', type=int, nargs='+', default=[256, 1024])
+  parser.add_argument('--sample-rates', type=int, nargs='+', default=[44100])
+  parser.add_argument('--blocks', type=int, default=200, help="blocks rendered per case")
+  parser.add_argument('--output', default='bench_results.json', help="where to save the results")
+  parser.add_argument('--compare', help="previous results file to compare against")
+
+  return parser.parse_args()
+
+def main():
+  args = parse_args()
+  results = run(args)
+
+  report = {
+    'date': datetime.datetime.now().isoformat(),
+    'python': sys.version,
+    'numpy': np.__version__,
+    'platform': platform.platform(),
+    'processor': platform.processor(),
+    'args': vars(args),
+    'results': results,
+  }
+
+  with open(args.output, 'w') as output_file:
+    json.dump(report, output_file, indent=2)
+
+  if args.compare:
+    compare(results, args.compare)
+
+if __name__ == "__main__":
+  main()
@@ -16,6 +16,14 @@ class KeyboardInput(object):
     self.queue = queue
     self._last_press = None
 
+    self.key_messages = {} # Key name -> (press message, release message), see route()
+    self.deliver = None
+
+  def route(self, key_messages, deliver):
+    """ Sends the messages of the keys in key_messages straight to deliver(message, timestamp), e.g. Synth.schedule, from the keyboard hook. Other keys still go through the queue. """
+    self.key_messages = key_messages
+    self.deliver = deliver
+
   def handle_event(self, event):
     if event.event_type == "down":
       self.onpress(event)
@@ -30,14 +38,22 @@ class KeyboardInput(object):
 
     self._last_press = key.name
 
-    self.queue.put(key.name, EVT_KEY_PRESSED, timestamp=press_time)
+    messages = self.key_messages.get(key.name)
+    if messages and self.deliver:
+      self.deliver(messages[0], press_time)
+    else:
+      self.queue.put(key.name, EVT_KEY_PRESSED, timestamp=press_time)
 
   def onrelease(self, key):
     release_time = time.time()
     if self._last_press == key.name:
       self._last_press = None
 
-    self.queue.put(key.name, EVT_KEY_RELEASED, timestamp=release_time)
+    messages = self.key_messages.get(key.name)
+    if messages and self.deliver:
+      self.deliver(messages[1], release_time)
+    else:
+      self.queue.put(key.name, EVT_KEY_RELEASED, timestamp=release_time)
 
   def start(self): # pragma: no cover
     keyboard.hook(self.handle_event)
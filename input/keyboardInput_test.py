@@ -0,0 +1,42 @@
+from unittest import TestCase, main
+
+from collections import namedtuple
+
+from midi import note_on, note_off
+from input.keyboardInput import KeyboardInput
+from synth.event_queue import EventQueue
+
+KeyEvent = namedtuple('KeyEvent', ['event_type', 'name'])
+
+KEY_MESSAGES = {'q': (note_on('E', 4, 127), note_off('E', 4, 127))}
+
+class KeyboardInputTest(TestCase):
+  def _create_routed_input(self):
+    queue = EventQueue()
+    delivered = []
+    kb = KeyboardInput(queue)
+    kb.route(KEY_MESSAGES, lambda message, timestamp: delivered.append((message, timestamp)))
+
+    return kb, queue, delivered
+
+  def test_route_MappedKeysShouldBeDeliveredDirectly(self):
+    kb, queue, delivered = self._create_routed_input()
+
+    kb.handle_event(KeyEvent('down', 'q'))
+    kb.handle_event(KeyEvent('down', 'q'))
+    kb.handle_event(KeyEvent('up', 'q'))
+
+    self.assertTrue(queue.empty())
+    self.assertEqual([message for message, _ in delivered], list(KEY_MESSAGES['q']))
+    self.assertTrue(all(timestamp for _, timestamp in delivered))
+
+  def test_route_OtherKeysShouldStillBeQueued(self):
+    kb, queue, delivered = self._create_routed_input()
+
+    kb.handle_event(KeyEvent('down', 'esc'))
+
+    self.assertEqual(delivered, [])
+    self.assertEqual(queue.qsize(), 1)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import stat
+import time
+import select
+import socket
+import threading
+
+import midi
+
+SOCKET_PREFIX = 'unix:'
+STDIN         = '-'
+
+READ_SIZE     = 4096
+POLL_INTERVAL = 0.1 # How often the reader checks if it was stopped
+
+class MidiStreamInput(object):
+  """ Reads raw MIDI bytes from stdin ('-'), a FIFO or any readable file path, or from the clients of a UNIX socket it listens on ('unix:<path>'). Each read is decoded as one batch and its channel messages are put into queue, e.g. Synth.input_queue, as midi events stamped with the time they were read. System messages are dropped, so the stream cannot stop the synth. """
+  def __init__(self, queue, source=STDIN):
+    self.queue  = queue
+    self.source = source
+
+    self._stop    = False
+    self._thread  = None
+    self._readers = {} # File descriptor -> (file or socket to close, MidiDecoder)
+    self._server  = None
+
+  def start(self):
+    if self.source.startswith(SOCKET_PREFIX):
+      self._server = self._listen(self.source[len(SOCKET_PREFIX):])
+    elif self.source == STDIN:
+      self._add_reader(sys.stdin.buffer)
+    else:
+      # Opening a FIFO for reading blocks until there is a writer, O_RDWR keeps it open when writers come and go
+      flags = os.O_RDWR if stat.S_ISFIFO(os.stat(self.source).st_mode) else os.O_RDONLY
+      self._add_reader(os.fdopen(os.open(self.source, flags), 'rb', buffering=0))
+
+    self._thread = threading.Thread(name='MidiInT', target=self._read_loop, daemon=True)
+    self._thread.start()
+
+  def stop(self):
+    self._stop = True
+    if self._thread:
+      self._thread.join()
+
+    for fd, (stream, _) in list(self._readers.items()):
+      if stream is not sys.stdin.buffer:
+        stream.close()
+    self._readers.clear()
+
+    if self._server:
+      path = self._server.getsockname()
+      self._server.close()
+      os.remove(path)
+
+  def _listen(self, path):
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+      os.remove(path) # Left over by a previous run
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+
+    return server
+
+  def _add_reader(self, stream):
+    self._readers[stream.fileno()] = (stream, midi.MidiDecoder())
+
+  def _read_loop(self):
+    while not self._stop:
+      fds = list(self._readers)
+      if self._server:
+        fds.append(self._server.fileno())
+
+      ready, _, _ = select.select(fds, [], [], POLL_INTERVAL)
+      for fd in ready:
+        if self._server and fd == self._server.fileno():
+          connection, _ = self._server.accept()
+          self._add_reader(connection)
+          continue
+
+        data = os.read(fd, READ_SIZE)
+        if not data:
+          self._close_reader(fd)
+          continue
+
+        self.process(data, self._readers[fd][1])
+
+  def _close_reader(self, fd):
+    stream, _ = self._readers.pop(fd)
+    if stream is not sys.stdin.buffer:
+      stream.close()
+
+  def process(self, data, decoder):
+    """ Decodes a batch of bytes and queues its channel messages. """
+    timestamp = time.time()
+
+    for message in decoder.decode(data):
+      if message.status < midi.ST_SYSEX:
+        self.queue.put(message, midi.EVT_MIDI, timestamp=timestamp)
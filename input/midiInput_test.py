@@ -0,0 +1,74 @@
+from unittest import TestCase, main
+
+import os
+import socket
+import tempfile
+import time
+
+import midi
+from input.midiInput import MidiStreamInput
+from synth.event_queue import EventQueue
+
+NOTES = bytes([0x90, 0x45, 0x64, 0x48, 0x64, 0xF1, 0x00, 0x80, 0x45, 0x00])
+
+def wait_for(queue, count, timeout=2.0):
+  deadline = time.monotonic() + timeout
+  while queue.qsize() < count and time.monotonic() < deadline:
+    time.sleep(0.01)
+
+  return [queue.get() for _ in range(queue.qsize())]
+
+class MidiStreamInputTest(TestCase):
+  def _assert_notes(self, events):
+    self.assertEqual([(event.type, event.item.status, event.item.data1) for event in events], [
+      (midi.EVT_MIDI, midi.ST_NOTE_ON, 0x45),
+      (midi.EVT_MIDI, midi.ST_NOTE_ON, 0x48),
+      (midi.EVT_MIDI, midi.ST_NOTE_OFF, 0x45),
+    ])
+    self.assertTrue(all(event.timestamp for event in events))
+
+  def test_process_ShouldQueueChannelMessagesOnly(self):
+    queue = EventQueue()
+    MidiStreamInput(queue).process(NOTES, midi.MidiDecoder())
+
+    self._assert_notes(wait_for(queue, 3))
+
+  def test_start_ShouldReadFromAFifo(self):
+    path = os.path.join(tempfile.mkdtemp(), 'midi')
+    os.mkfifo(path)
+    queue = EventQueue()
+    midi_input = MidiStreamInput(queue, path)
+
+    try:
+      midi_input.start()
+      with open(path, 'wb') as fifo:
+        fifo.write(NOTES[:4])
+        fifo.flush()
+        fifo.write(NOTES[4:])
+
+      events = wait_for(queue, 3)
+    finally:
+      midi_input.stop()
+      os.remove(path)
+
+    self._assert_notes(events)
+
+  def test_start_ShouldReadFromSocketClients(self):
+    path = os.path.join(tempfile.mkdtemp(), 'midi.sock')
+    queue = EventQueue()
+    midi_input = MidiStreamInput(queue, 'unix:' + path)
+
+    try:
+      midi_input.start()
+      with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        client.sendall(NOTES)
+        events = wait_for(queue, 3)
+    finally:
+      midi_input.stop()
+
+    self._assert_notes(events)
+    self.assertFalse(os.path.exists(path))
+
+if __name__ == '__main__':
+  main()
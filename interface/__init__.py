@@ -1,2 +1,10 @@
 from .cli_interface import *
-from .tk_interface import *
\ No newline at end of file
+from .scheduler import *
+
+def __getattr__(name):
+  # Tk and matplotlib take a while to import, so the Tk interface is only loaded when asked for
+  if name in ('TkInterface', 'Window'):
+    from . import tk_interface
+    return getattr(tk_interface, name)
+
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,37 @@
+import collections
+
+import numpy as np
+
+PREVIEW_FREQUENCY  = 440
+PREVIEW_CACHE_SIZE = 32
+
+class PreviewCache(object):
+  """ Memoizes the waveform previews of oscilators, keyed by the oscilator and the version of its parameters (see Oscilator.version).
+
+  A preview is only evaluated again after one of its parameters changed, so polling it every frame is cheap, and the same array is returned while nothing changed. The size most recently used previews are kept. """
+  def __init__(self, duration, sample_rate, frequency=PREVIEW_FREQUENCY, size=PREVIEW_CACHE_SIZE):
+    self.time_axis = np.arange(0, duration, 1/sample_rate)
+    self.frequency = frequency
+    self.size      = size
+
+    self.hits   = 0
+    self.misses = 0
+
+    self._previews = collections.OrderedDict()
+
+  def get(self, oscilator):
+    key = (oscilator, oscilator.version())
+
+    preview = self._previews.get(key)
+    if preview is not None:
+      self._previews.move_to_end(key)
+      self.hits += 1
+      return preview
+
+    preview = oscilator.evaluate(self.time_axis, self.frequency)
+    self._previews[key] = preview
+    if len(self._previews) > self.size:
+      self._previews.popitem(last=False)
+    self.misses += 1
+
+    return preview
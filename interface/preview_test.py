@@ -0,0 +1,59 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from synth.oscilator import (Oscilator, default_oscilators)
+from synth.waveform import WaveForm
+from synth.parameter import Parameter
+from interface.preview import PreviewCache
+
+class PreviewCacheTest(TestCase):
+  def test_get_ShouldReuseThePreviewUntilAParameterChanges(self):
+    cache = PreviewCache(0.01, 1000)
+    oscilator = default_oscilators()[0]
+
+    preview = cache.get(oscilator)
+    self.assertIs(cache.get(oscilator), preview)
+
+    oscilator.volume.set_relative(0.25)
+    changed = cache.get(oscilator)
+
+    self.assertIsNot(changed, preview)
+    np.testing.assert_allclose(changed, preview * 0.5)
+    self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+  def test_get_ShouldFollowWaveformParameters(self):
+    cache = PreviewCache(0.01, 1000)
+    duty = Parameter('duty')
+    oscilator = Oscilator(WaveForm(lambda t, duty: np.where(np.mod(t, 2 * np.pi) < 2 * np.pi * duty, 1.0, -1.0), {'duty': duty}))
+
+    preview = cache.get(oscilator)
+    duty.set_relative(0.25)
+
+    self.assertIsNot(cache.get(oscilator), preview)
+
+  def test_setRelative_SameValueShouldNotInvalidate(self):
+    cache = PreviewCache(0.01, 1000)
+    oscilator = default_oscilators()[0]
+
+    preview = cache.get(oscilator)
+    oscilator.volume.set_relative(oscilator.volume.get_relative())
+
+    self.assertIs(cache.get(oscilator), preview)
+
+  def test_get_ShouldEvictLeastRecentlyUsed(self):
+    cache = PreviewCache(0.01, 1000, size=2)
+    oscilators = default_oscilators()[:3]
+
+    first = cache.get(oscilators[0])
+    cache.get(oscilators[1])
+    cache.get(oscilators[0])
+    cache.get(oscilators[2])
+
+    self.assertIs(cache.get(oscilators[0]), first)
+    self.assertEqual(cache.misses, 3)
+    cache.get(oscilators[1])
+    self.assertEqual(cache.misses, 4)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,35 @@
+import time
+
+DEFAULT_FPS = 30
+
+class FrameScheduler(object):
+  """ Paces the redraws of the visualizations: one frame every 1/fps seconds at most, and on each frame only the visualizations that changed are drawn.
+
+  Frames are objects with a refresh() method that redraws them if needed and returns whether it did. tick() runs one frame and returns how long to wait for the next one, so the caller (e.g. Tk's after) sleeps instead of spinning. """
+  def __init__(self, fps=DEFAULT_FPS, clock=time.perf_counter):
+    self.interval = 1.0 / fps
+    self.clock    = clock
+    self.frames   = []
+
+    self.next_frame = None
+    self.ticks      = 0
+    self.draws      = 0
+
+  def add(self, frame):
+    self.frames.append(frame)
+
+  def tick(self):
+    """ Refreshes every frame and returns the seconds until the next tick is due. """
+    now = self.clock()
+
+    for frame in self.frames:
+      if frame.refresh():
+        self.draws += 1
+    self.ticks += 1
+
+    # Keep a steady pace, but don't try to catch up on frames missed while busy
+    if self.next_frame is None or now - self.next_frame > self.interval:
+      self.next_frame = now
+    self.next_frame += self.interval
+
+    return max(self.next_frame - self.clock(), 0.0)
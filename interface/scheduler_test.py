@@ -0,0 +1,55 @@
+from unittest import TestCase, main
+
+from interface.scheduler import FrameScheduler
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self):
+    return self.now
+
+class FakeFrame(object):
+  def __init__(self):
+    self.dirty = True
+    self.refreshes = 0
+
+  def refresh(self):
+    self.refreshes += 1
+    drawn, self.dirty = self.dirty, False
+    return drawn
+
+class FrameSchedulerTest(TestCase):
+  def test_tick_ShouldWaitForTheNextFrame(self):
+    clock = FakeClock()
+    scheduler = FrameScheduler(fps=20, clock=clock)
+
+    self.assertAlmostEqual(scheduler.tick(), 0.05)
+    clock.now = 0.02
+    self.assertAlmostEqual(scheduler.tick(), 0.08)
+
+  def test_tick_ShouldNotCatchUpAfterStalls(self):
+    clock = FakeClock()
+    scheduler = FrameScheduler(fps=20, clock=clock)
+
+    scheduler.tick()
+    clock.now = 1.0
+    self.assertAlmostEqual(scheduler.tick(), 0.05)
+
+  def test_tick_ShouldOnlyCountDirtyFramesAsDrawn(self):
+    scheduler = FrameScheduler(clock=FakeClock())
+    frames = [FakeFrame(), FakeFrame()]
+    for frame in frames:
+      scheduler.add(frame)
+
+    scheduler.tick()
+    frames[1].dirty = True
+    scheduler.tick()
+    scheduler.tick()
+
+    self.assertEqual(scheduler.ticks, 3)
+    self.assertEqual(scheduler.draws, 3)
+    self.assertEqual([frame.refreshes for frame in frames], [3, 3])
+
+if __name__ == '__main__':
+  main()
@@ -7,11 +7,14 @@ from tkinter.ttk import LabelFrame
 from tkinter.ttk import Scale
 
 from .widgets import (Knob, SynthFrame, KnobFrame, VisualizationFrame, OscilatorFrame)
+from .scheduler import (FrameScheduler, DEFAULT_FPS)
+from .preview import PreviewCache
 
 LOGGER_NAME = 'TkInterface'
+STATS_INTERVAL_MS = 250
 
 class Window(Frame):
-  def __init__(self, synth, log, master=None):
+  def __init__(self, synth, log, master=None, fps=DEFAULT_FPS):
     Frame.__init__(
       self,
       master
@@ -25,8 +28,9 @@ class Window(Frame):
     self.sampler = synth.sampler
     self.oscilators = synth.oscilators
 
-    self.plot_frames = []
-    self.update_frames = []
+    self.stats_vars = {}
+    self.scheduler = FrameScheduler(fps)
+    self.previews = PreviewCache(self.sampler.sample_size / self.sampler.sample_rate, self.sampler.sample_rate)
 
     self._create_window()
 
@@ -34,6 +38,8 @@ class Window(Frame):
     self.master.title("JustASynth")
 
     self._create_oscilator_section().pack(side=tkinter.LEFT)
+    if self.sampler.envelopes:
+      self._create_envelope_section().pack(side=tkinter.LEFT)
     self._create_master().pack(side=tkinter.LEFT)
 
     self.pack()
@@ -90,57 +96,92 @@ class Window(Frame):
       text=f"Latency: {self.player.stream.latency * 1000}ms"
     ).pack()
 
-    graph_frame = self._create_graph_frame(master_frame, lambda: self.player.master_sample)
+    graph_frame = self._create_graph_frame(master_frame, lambda: self.player.master_sample, live=True)
     graph_frame.pack()
-    
-    self.plot_frames.append(graph_frame)
+    self.scheduler.add(graph_frame)
+
+    self._create_stats(master_frame).pack()
 
     return master_frame
 
+  def _create_stats(self, master):
+    stats_frame = SynthFrame(master, "Engine")
+
+    for name in ('dsp_load', 'render_time', 'deadline_misses', 'queue_depth', 'underflows', 'tuning'):
+      self.stats_vars[name] = tkinter.StringVar()
+      Label(stats_frame, textvariable=self.stats_vars[name]).pack(anchor=tkinter.W)
+
+    self.after(STATS_INTERVAL_MS, self.update_stats)
+
+    return stats_frame
+
+  def update_stats(self):
+    stats = self.synth.get_stats()
+
+    self.stats_vars['dsp_load'].set(f"DSP Load: {stats['dsp_load']:.0f}% (peak {stats['dsp_load_peak']:.0f}%)")
+    self.stats_vars['render_time'].set(f"Render: {stats['render_time_p50_ms']:.2f}ms p50, {stats['render_time_p99_ms']:.2f}ms p99")
+    self.stats_vars['deadline_misses'].set(f"Deadline Misses: {stats['deadline_misses']}/{stats['blocks']}")
+    self.stats_vars['queue_depth'].set(f"Queue Depth: {stats['queue_depth']}")
+    self.stats_vars['underflows'].set(f"Underflows: {stats['output_underflows']} Underruns: {stats['underruns']}")
+    self.stats_vars['tuning'].set(f"Blocks: {stats['block_size']} x {stats['output_depth']} + {stats['player_queue']} ({stats['buffer_latency_ms']:.1f}ms)")
+
+    self.after(STATS_INTERVAL_MS, self.update_stats)
+
   def _create_oscilator_section(self):
     osc_section = SynthFrame(self, "Oscilators")
 
     for osc in self.oscilators:
       osc_frame = self._create_oscilator(osc_section, osc)
       osc_frame.pack()
-      self.update_frames.append(osc_frame)
+      self.scheduler.add(osc_frame)
 
     return osc_section
 
+  def _create_envelope_section(self):
+    envelope_section = SynthFrame(self, "Envelope")
+
+    for param in self.sampler.envelopes.parameters.values():
+      KnobFrame(
+        envelope_section,
+        param.name,
+        command=param.set_relative,
+        max_value=param.max_value,
+        min_value=param.min_value,
+        label_format=param.label_format if param.label_format else "{0:.2f}"
+      ).pack()
+
+    return envelope_section
+
   def _create_oscilator(self, master, oscilator):
     osc_frame = OscilatorFrame(
       master,
       oscilator,
-      self.sampler.sample_size / self.sampler.sample_rate,
-      self.sampler.sample_rate
+      self.previews
     )
 
     return osc_frame
 
-  def _create_graph_frame(self, master, data_source):
+  def _create_graph_frame(self, master, data_source, live=False):
     graph_frame = VisualizationFrame(
       master,
-      data_source
+      data_source,
+      live=live
     )
 
     return graph_frame
 
   def update_canvas(self):
-    for frame in self.plot_frames:
-      frame.plot()
-    
-    for frame in self.plot_frames + self.update_frames:
-      frame.update_canvas()
+    wait = self.scheduler.tick()
 
-    self.after(0, self.update_canvas)
+    self.after(max(int(wait * 1000), 1), self.update_canvas)
 
 class TkInterface(object):
-  def __init__(self, synth, log=None):
+  def __init__(self, synth, log=None, fps=DEFAULT_FPS):
     self.log = log.getChild(LOGGER_NAME) if log else logging.getLogger(LOGGER_NAME)
     self.root = tkinter.Tk()
     self.root.geometry("")
     
-    self.window = Window(synth, self.log, self.root)
+    self.window = Window(synth, self.log, self.root, fps=fps)
     self.window.after(0, self.window.update_canvas)
   
   def start(self, exit_action=None):
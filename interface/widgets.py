@@ -164,17 +164,28 @@ class KnobFrame(SynthFrame):
     self.text_var.set(lbl_val)
 
 class VisualizationFrame(SynthFrame):
-  def __init__(self, master, data, name="Visualization"):
+  """ Plots the array returned by data (or data itself) as a line.
+
+  The frame is only redrawn when it is dirty: after invalidate() or, when live, whenever data returns a different array. Redraws blit the line over a saved background instead of drawing the whole figure again. """
+  def __init__(self, master, data, name="Visualization", live=False):
     super().__init__(master, name)
     self.data = data
+    self.live = live
+
+    self.dirty = True
+    self._data = None
+    self._xlimits = None
+    self._background = None
+
     self._init_plot_components()
   
   def _init_plot_components(self):
     fig = Figure((2,1))
 
     self.ax = fig.add_subplot(111)
-    self.line, = self.ax.plot(0)
+    self.line, = self.ax.plot(0, animated=True)
     self.canvas = FigureCanvasTkAgg(fig, master=self)
+    self.canvas.mpl_connect('draw_event', self._save_background)
 
     self.ax.set_xlim((0, 1))
     self.ax.set_ylim((-1,1))
@@ -186,35 +197,68 @@ class VisualizationFrame(SynthFrame):
   def plot(self):
     data = self.data() if callable(self.data) else self.data
     
-    if data is not None:
+    if data is not None and data is not self._data:
       data_size = len(data)
       time_axis = np.arange(data_size)
       xlimits = (0, data_size)
 
       self.line.set_data(time_axis, data)
-      self.ax.set_xlim(xlimits)
+      if xlimits != self._xlimits:
+        self.ax.set_xlim(xlimits)
+        self._xlimits = xlimits
+        self._background = None # The axes changed, draw everything again
+
+      self._data = data
+      self.dirty = True
+
+  def invalidate(self):
+    self.dirty = True
+
+  def refresh(self):
+    """ Plots the data again if it may have changed and redraws the line if it did. Returns True if it was redrawn. """
+    if self.live or self.dirty:
+      self.plot()
+
+    if not self.dirty:
+      return False
+
+    self.update_canvas()
+    self.dirty = False
+
+    return True
+
+  def _save_background(self, event):
+    # The line is animated, so full draws leave it out of the background; draw it on top
+    self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+    self.ax.draw_artist(self.line)
 
   def update_canvas(self):
     try:
-      self.canvas.draw()
-      self.canvas.flush_events()
+      if self._background is None:
+        self.canvas.draw()
+      else:
+        self.canvas.restore_region(self._background)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
     except tk.TclError:
       pass
 
 class OscilatorFrame(SynthFrame):
-  def __init__(self, master, oscilator, vizualization_duration, vizualization_sample_rate):
+  """ Knobs for the parameters of an oscilator and its waveform, next to a preview of it.
+
+  The preview comes from previews, a PreviewCache, and is polled once per frame: however many knob events came since the last frame, it is evaluated at most once, and only if a parameter changed. """
+  def __init__(self, master, oscilator, previews):
     super().__init__(master, oscilator.name)
     self.oscilator = oscilator
     
-    data_source = lambda: oscilator.evaluate(np.arange(0, vizualization_duration, 1/vizualization_sample_rate), 440)
-    self.graph_frame = VisualizationFrame(self, data_source)
+    self.graph_frame = VisualizationFrame(self, lambda: previews.get(oscilator), live=True)
     self.graph_frame.pack(side=tk.LEFT)
     
     for param in oscilator.parameters.values():
       KnobFrame(
         self,
         param.name,
-        command=[param.set_relative, lambda v: self.graph_frame.plot()],
+        command=param.set_relative,
         max_value=param.max_value,
         min_value=param.min_value,
         label_format=param.label_format if param.label_format else "{0:.2f}"
@@ -225,7 +269,7 @@ class OscilatorFrame(SynthFrame):
         KnobFrame(
           self,
           wave_param.name,
-          command=[wave_param.set_relative, lambda v: self.graph_frame.plot()],
+          command=wave_param.set_relative,
           max_value=wave_param.max_value,
           min_value=wave_param.min_value,
           label_format=wave_param.label_format if wave_param.label_format else "{0:.2f}"
@@ -233,7 +277,9 @@ class OscilatorFrame(SynthFrame):
   
   def update(self, value, func):
     func(value)
-    self.graph_frame.plot()
   
+  def refresh(self):
+    return self.graph_frame.refresh()
+
   def update_canvas(self):
-    self.graph_frame.update_canvas()
\ No newline at end of file
+    self.graph_frame.update_canvas()
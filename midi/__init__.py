@@ -1 +1,3 @@
 from .midi import *
+from .decoder import MidiDecoder
+from .smf import MidiFile
@@ -0,0 +1,65 @@
+from .midi import (MidiMessage, SysExMessage, DATA_LENGTH, ST_NOTE_ON, ST_NOTE_OFF, ST_SYSEX, ST_SYSEX_END, ST_REAL_TIME)
+
+class MidiDecoder(object):
+  """ Decodes raw MIDI bytes, as read from a port, a pipe or a socket, into MidiMessages.
+
+  Running status and incomplete messages are kept between calls, so a message can be split across buffers anywhere. Real time messages may come in the middle of other messages, as the MIDI spec allows. System messages cancel the running status. A note on with velocity 0 is decoded as a note off. """
+  def __init__(self):
+    self.status = None # Running status
+    self._data  = []   # Data bytes of the message being decoded
+    self._sysex = None # Bytes of the SysEx being decoded
+
+  def decode(self, data):
+    """ Returns the messages completed by the bytes in data. """
+    messages = []
+    status = self.status
+    pending = self._data
+
+    for byte in data:
+      if byte >= ST_REAL_TIME:
+        messages.append(MidiMessage(byte, 0, 0))
+        continue
+
+      if self._sysex is not None:
+        if byte < 0x80:
+          self._sysex.append(byte)
+          continue
+
+        messages.append(SysExMessage(bytes(self._sysex)))
+        self._sysex = None
+        if byte == ST_SYSEX_END:
+          continue
+
+      if byte & 0x80:
+        del pending[:]
+        if byte == ST_SYSEX:
+          self._sysex = bytearray()
+          status = None
+        elif DATA_LENGTH[byte] == 0:
+          messages.append(MidiMessage(byte, 0, 0))
+          status = None
+        else:
+          status = byte
+        continue
+
+      if status is None:
+        continue # Data without a status, e.g. the rest of a message we started listening in the middle of
+
+      pending.append(byte)
+      if len(pending) == DATA_LENGTH[status]:
+        messages.append(self._message(status, pending))
+        del pending[:]
+        if status >= ST_SYSEX:
+          status = None
+
+    self.status = status
+    return messages
+
+  def _message(self, status, data):
+    data1 = data[0]
+    data2 = data[1] if len(data) > 1 else 0
+
+    if status & 0xF0 == ST_NOTE_ON and data2 == 0:
+      return MidiMessage(ST_NOTE_OFF | (status & 0x0F), data1, 0)
+
+    return MidiMessage(status, data1, data2)
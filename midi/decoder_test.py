@@ -0,0 +1,49 @@
+import unittest
+
+from midi import (MidiDecoder, MidiMessage, SysExMessage, ST_NOTE_ON, ST_NOTE_OFF, ST_CONTROL_CHANGE, ST_PROGRAM_CHANGE)
+
+def as_tuples(messages):
+  return [(message.status, message.data1, message.data2) for message in messages]
+
+class MidiDecoderTest(unittest.TestCase):
+  def test_decode_ShouldUseRunningStatus(self):
+    messages = MidiDecoder().decode(bytes([0x92, 0x45, 0x64, 0x48, 0x64, 0x45, 0x00]))
+
+    self.assertEqual(as_tuples(messages), [
+      (ST_NOTE_ON | 2, 0x45, 0x64),
+      (ST_NOTE_ON | 2, 0x48, 0x64),
+      (ST_NOTE_OFF | 2, 0x45, 0x00),
+    ])
+    self.assertEqual([message.channel for message in messages], [2, 2, 2])
+
+  def test_decode_ShouldKeepIncompleteMessagesBetweenCalls(self):
+    decoder = MidiDecoder()
+
+    self.assertEqual(decoder.decode(bytes([0xB0, 0x07])), [])
+    self.assertEqual(as_tuples(decoder.decode(bytes([0x7F, 0xC1, 0x05]))), [
+      (ST_CONTROL_CHANGE, 0x07, 0x7F),
+      (ST_PROGRAM_CHANGE | 1, 0x05, 0),
+    ])
+
+  def test_decode_RealTimeShouldNotBreakMessages(self):
+    messages = MidiDecoder().decode(bytes([0x90, 0x45, 0xF8, 0x64]))
+
+    self.assertEqual(as_tuples(messages), [(0xF8, 0, 0), (ST_NOTE_ON, 0x45, 0x64)])
+
+  def test_decode_ShouldCollectSysEx(self):
+    decoder = MidiDecoder()
+    messages = decoder.decode(bytes([0x90, 0xF0, 0x7E, 0x01]) + bytes([0x02, 0xF7, 0x45, 0x64]))
+
+    self.assertEqual(len(messages), 1)
+    self.assertIsInstance(messages[0], SysExMessage)
+    self.assertEqual(messages[0].data, bytes([0x7E, 0x01, 0x02]))
+    self.assertIsNone(decoder.status) # SysEx cancels running status
+
+  def test_midiMessage_ShouldHaveNoDict(self):
+    message = MidiMessage(ST_NOTE_ON | 3, 0x45, 0x64)
+
+    self.assertFalse(hasattr(message, '__dict__'))
+    self.assertEqual((message.type, message.channel), (ST_NOTE_ON, 3))
+
+if __name__ == '__main__':
+  unittest.main()
@@ -13,9 +13,20 @@ midi_note_table = {
   "B":  11
 }
 
-ST_NOTE_OFF = 0x80
-ST_NOTE_ON  = 0x90
-ST_SYS_COM  = 0xF1
+ST_NOTE_OFF          = 0x80
+ST_NOTE_ON           = 0x90
+ST_POLY_PRESSURE     = 0xA0
+ST_CONTROL_CHANGE    = 0xB0
+ST_PROGRAM_CHANGE    = 0xC0
+ST_CHANNEL_PRESSURE  = 0xD0
+ST_PITCH_BEND        = 0xE0
+ST_SYSEX             = 0xF0
+ST_MTC_QUARTER_FRAME = 0xF1
+ST_SYSEX_END         = 0xF7
+ST_REAL_TIME         = 0xF8 # And above, single byte messages
+
+# Number of data bytes after each status byte
+DATA_LENGTH = [0] * 0x80 + [2] * 0x40 + [1] * 0x20 + [2] * 0x10 + [0, 1, 2, 1, 0, 0, 0, 0] + [0] * 8
 
 EVT_MIDI    = 'midi_'
 
@@ -35,6 +46,8 @@ def midi_number_to_freq(note_number):
 
  return freq
 
+NOTE_FREQUENCIES = [midi_number_to_freq(note_number) for note_number in range(128)]
+
 def note_on(note, octave, velocity):
   note_number = note_to_midi_number(note, octave)
   status = ST_NOTE_ON
@@ -56,18 +69,38 @@ def note_off(note, octave, velocity):
   )
 
 class MidiMessage(object):
+  """ A MIDI message of up to two data bytes. For channel messages, the channel is in the lower nibble of the status byte and type is the status without it. """
+  __slots__ = ('status', 'data1', 'data2')
+
   def __init__(self, status, data1, data2):
     self.status = status
     self.data1  = data1
     self.data2  = data2
 
+  @property
+  def type(self):
+    return self.status & 0xF0 if self.status < ST_SYSEX else self.status
+
+  @property
+  def channel(self):
+    return self.status & 0x0F if self.status < ST_SYSEX else None
+
   def __str__(self):
     return f"MidiMessage({self.status:x}; {self.data1:x}; {self.data2:x})"
 
+class SysExMessage(MidiMessage):
+  """ A System Exclusive message, data holding the bytes between its start and end. """
+  __slots__ = ('data',)
+
+  def __init__(self, data):
+    super().__init__(ST_SYSEX, 0, 0)
+    self.data = data
+
+  def __str__(self):
+    return f"SysExMessage({self.data.hex()})"
+
 class MidiException(Exception):
   def __init__(self, message):
     super().__init__(self, message)
 
-    self.message = message
-
-SYSCOM_EXIT = MidiMessage(ST_SYS_COM, 0x0, 0x0)
\ No newline at end of file
+    self.message = message
\ No newline at end of file
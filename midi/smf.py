@@ -0,0 +1,145 @@
+import heapq
+import struct
+import time
+from operator import itemgetter
+
+from .midi import (MidiMessage, MidiException, ST_NOTE_ON, ST_NOTE_OFF, EVT_MIDI, DATA_LENGTH)
+
+DEFAULT_TEMPO = 500000 # Microseconds per quarter note (120 bpm)
+
+META_EVENT        = 0xFF
+META_TEMPO        = 0x51
+META_END_OF_TRACK = 0x2F
+SYSEX_EVENTS      = (0xF0, 0xF7)
+
+def read_variable_length(data, position):
+  """ Reads a variable length quantity starting at position. Returns (value, position after it). """
+  value = 0
+  while True:
+    byte = data[position]
+    position += 1
+    value = (value << 7) | (byte & 0x7F)
+    if byte < 0x80:
+      return value, position
+
+def read_chunk_header(file):
+  """ Returns (chunk type, length) of the chunk at the current position of file, or (None, 0) at the end of it. """
+  header = file.read(8)
+  if len(header) < 8:
+    return None, 0
+
+  return header[:4], struct.unpack('>I', header[4:])[0]
+
+class MidiFile(object):
+  """ A Standard MIDI File, format 0 or 1, read lazily.
+
+  Only the header and the position of each track are read when opening it. Iterating over a MidiFile decodes its tracks as it goes, merging them by time with a heap, and yields (time, MidiMessage) tuples with time in seconds from the start, following the tempo changes. That is the format OfflineRenderer.render takes; play() feeds the messages to a synth in real time instead. """
+  def __init__(self, path):
+    self.path = path
+    self.tracks = [] # (offset, length) of each track chunk
+
+    with open(path, 'rb') as file:
+      chunk_type, length = read_chunk_header(file)
+      if chunk_type != b'MThd':
+        raise MidiException(f"'{path}' is not a Standard MIDI File.")
+
+      self.format, self.num_tracks, division = struct.unpack('>HHH', file.read(length)[:6])
+      if self.format not in (0, 1):
+        raise MidiException(f"Unsupported MIDI file format {self.format}.")
+
+      while len(self.tracks) < self.num_tracks:
+        chunk_type, length = read_chunk_header(file)
+        if chunk_type is None:
+          break
+        if chunk_type == b'MTrk':
+          self.tracks.append((file.tell(), length))
+        file.seek(length, 1)
+
+    if division & 0x8000:
+      # SMPTE time: negative frames per second in the upper byte, ticks per frame in the lower one
+      frames_per_second = 256 - (division >> 8)
+      self.ticks_per_quarter = None
+      self.seconds_per_tick = 1.0 / (frames_per_second * (division & 0xFF))
+    else:
+      self.ticks_per_quarter = division
+      self.seconds_per_tick = None
+
+  def tick_duration(self, tempo):
+    """ Seconds per tick at tempo, in microseconds per quarter note. """
+    if self.seconds_per_tick is not None:
+      return self.seconds_per_tick
+
+    return tempo / (self.ticks_per_quarter * 1000000)
+
+  def track(self, index):
+    """ Yields (tick, MidiMessage) for the channel messages of a track and (tick, tempo) for its tempo changes. A note on with velocity 0 is yielded as a note off. """
+    offset, length = self.tracks[index]
+    with open(self.path, 'rb') as file:
+      file.seek(offset)
+      data = file.read(length)
+
+    position = 0
+    tick = 0
+    status = None
+
+    while position < len(data):
+      delta, position = read_variable_length(data, position)
+      tick += delta
+      byte = data[position]
+
+      if byte == META_EVENT:
+        meta_type = data[position + 1]
+        size, position = read_variable_length(data, position + 2)
+        if meta_type == META_TEMPO:
+          yield tick, int.from_bytes(data[position:position + size], 'big')
+        elif meta_type == META_END_OF_TRACK:
+          return
+        position += size
+        continue
+
+      if byte in SYSEX_EVENTS:
+        size, position = read_variable_length(data, position + 1)
+        position += size
+        status = None
+        continue
+
+      if byte & 0x80:
+        status = byte
+        position += 1
+      elif status is None:
+        raise MidiException(f"Data byte {byte:x} without a status in track {index}.")
+
+      message_type = status & 0xF0
+      data1 = data[position]
+      data2 = data[position + 1] if DATA_LENGTH[status] == 2 else 0
+      position += DATA_LENGTH[status]
+
+      if message_type == ST_NOTE_ON and data2 == 0:
+        yield tick, MidiMessage(ST_NOTE_OFF | (status & 0x0F), data1, 0)
+      else:
+        yield tick, MidiMessage(status, data1, data2)
+
+  def __iter__(self):
+    tempo = DEFAULT_TEMPO
+    last_tick = 0
+    seconds = 0.0
+
+    # merge is stable, so on the same tick the tempo track (the first one) goes first
+    for tick, value in heapq.merge(*[self.track(i) for i in range(len(self.tracks))], key=itemgetter(0)):
+      seconds += (tick - last_tick) * self.tick_duration(tempo)
+      last_tick = tick
+
+      if isinstance(value, MidiMessage):
+        yield seconds, value
+      else:
+        tempo = value
+
+  def play(self, queue, start=None, lead=0.05):
+    """ Puts the messages into queue, e.g. Synth.input_queue, as timed midi events. Each one is put lead seconds ahead and timestamped with the time.time() it is due at, so the synth applies it on its exact sample. Blocks until the last message is put. """
+    start = time.time() if start is None else start
+
+    for seconds, message in self:
+      wait = start + seconds - lead - time.time()
+      if wait > 0:
+        time.sleep(wait)
+      queue.put(message, EVT_MIDI, timestamp=start + seconds)
@@ -0,0 +1,76 @@
+import unittest
+
+import os
+import struct
+import tempfile
+
+from midi import (MidiFile, MidiException, ST_NOTE_ON, ST_NOTE_OFF)
+from synth.event_queue import EventQueue
+
+def chunk(chunk_type, data):
+  return chunk_type + struct.pack('>I', len(data)) + data
+
+def write_file(data):
+  fd, path = tempfile.mkstemp(suffix='.mid')
+  with os.fdopen(fd, 'wb') as file:
+    file.write(data)
+
+  return path
+
+# Format 1, 96 ticks per quarter. The tempo track goes from 120 to 60 bpm on the second beat
+TEMPO_TRACK = bytes([
+  0x00, 0xFF, 0x51, 0x03, 0x07, 0xA1, 0x20,
+  0x60, 0xFF, 0x51, 0x03, 0x0F, 0x42, 0x40,
+  0x00, 0xFF, 0x2F, 0x00,
+])
+# Notes on channel 2, using running status and a note on with velocity 0 as note off
+NOTE_TRACK = bytes([
+  0x00, 0xF0, 0x03, 0x7E, 0x7F, 0xF7,
+  0x00, 0x91, 0x45, 0x64,
+  0x60, 0x48, 0x64,
+  0x60, 0x45, 0x00,
+  0x00, 0x81, 0x48, 0x40,
+  0x00, 0xFF, 0x2F, 0x00,
+])
+SMF = chunk(b'MThd', struct.pack('>HHH', 1, 2, 96)) + chunk(b'MTrk', TEMPO_TRACK) + chunk(b'MTrk', NOTE_TRACK)
+
+class MidiFileTest(unittest.TestCase):
+  def setUp(self):
+    self.path = write_file(SMF)
+
+  def tearDown(self):
+    os.remove(self.path)
+
+  def test_init_ShouldReadHeaderOnly(self):
+    midi_file = MidiFile(self.path)
+
+    self.assertEqual(midi_file.format, 1)
+    self.assertEqual(midi_file.ticks_per_quarter, 96)
+    self.assertEqual(len(midi_file.tracks), 2)
+
+  def test_iter_ShouldMergeTracksFollowingTempo(self):
+    events = [(time, message.status, message.data1, message.data2) for time, message in MidiFile(self.path)]
+
+    self.assertEqual(events, [
+      (0.0, ST_NOTE_ON | 1, 0x45, 0x64),
+      (0.5, ST_NOTE_ON | 1, 0x48, 0x64),
+      (1.5, ST_NOTE_OFF | 1, 0x45, 0x00),
+      (1.5, ST_NOTE_OFF | 1, 0x48, 0x40),
+    ])
+
+  def test_play_ShouldQueueTimedEvents(self):
+    queue = EventQueue()
+    MidiFile(self.path).play(queue, start=0.0)
+
+    timestamps = [queue.get().timestamp for _ in range(queue.qsize())]
+    self.assertEqual(timestamps, [0.0, 0.5, 1.5, 1.5])
+
+  def test_init_NotAMidiFileShouldRaise(self):
+    path = write_file(b'RIFF0000WAVE')
+    try:
+      self.assertRaises(MidiException, MidiFile, path)
+    finally:
+      os.remove(path)
+
+if __name__ == '__main__':
+  unittest.main()
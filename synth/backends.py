@@ -0,0 +1,178 @@
+import threading
+import time
+import numpy as np
+
+from .wav import WavWriter
+
+DEFAULT_BLOCKSIZE = 1024
+POLL_INTERVAL     = 0.1 # How often an unclocked stream waiting for data checks if it was closed
+
+class AudioBackend(object):
+  """ Where the Player sends its audio. A backend lists output devices and opens output streams that follow the sounddevice.OutputStream interface (start, write, close, blocksize and latency).
+
+  Unclocked backends have no device pulling samples at a fixed rate: their callback streams only pull when told there is data, see SimulatedStream.pull_when. """
+  clocked = True
+
+  def read_devices(self):
+    raise NotImplementedError
+
+  def default_device(self):
+    raise NotImplementedError
+
+  def open_stream(self, channels, dtype, device, sample_rate, blocksize, latency, callback=None):
+    raise NotImplementedError
+
+class SoundDeviceBackend(AudioBackend):
+  """ Plays through PortAudio, using python-sounddevice. """
+  def read_devices(self):
+    import sounddevice as sd
+
+    output_devices = {}
+    dev_list = sd.query_devices()
+    for i in range(len(dev_list)):
+      dev = dev_list[i]
+      if dev['max_output_channels'] > 0:
+        output_devices[i] = dev
+  
+    return output_devices
+
+  def default_device(self):
+    import sounddevice as sd
+
+    return sd.default.device[1]
+
+  def open_stream(self, channels, dtype, device, sample_rate, blocksize, latency, callback=None):
+    import sounddevice as sd
+
+    return sd.OutputStream(
+      channels=channels,
+      dtype=dtype,
+      device=device,
+      samplerate=sample_rate,
+      blocksize=blocksize,
+      latency=latency,
+      callback=callback
+    )
+
+class NullBackend(AudioBackend):
+  """ Discards the audio. With realtime=True blocks are consumed at the rate a sound card would; otherwise as fast as they are produced. """
+  name = 'Null'
+
+  def __init__(self, realtime=True):
+    self.realtime = realtime
+
+  @property
+  def clocked(self):
+    return self.realtime
+
+  def read_devices(self):
+    return {0: {'name': self.name, 'max_output_channels': 2, 'default_samplerate': 44100}}
+
+  def default_device(self):
+    return 0
+
+  def open_stream(self, channels, dtype, device, sample_rate, blocksize, latency, callback=None):
+    return SimulatedStream(self._consume, channels, dtype, sample_rate, blocksize, latency, callback, self.realtime)
+
+  def _consume(self, data):
+    pass
+
+class FileBackend(NullBackend):
+  """ Writes the audio to a float WAV file, as fast as it is produced unless realtime=True. """
+  name = 'File'
+
+  def __init__(self, path, realtime=False):
+    super().__init__(realtime=realtime)
+    self.path = path
+    self.writer = None
+
+  def open_stream(self, channels, dtype, device, sample_rate, blocksize, latency, callback=None):
+    self.writer = WavWriter(self.path, sample_rate, channels)
+    stream = super().open_stream(channels, dtype, device, sample_rate, blocksize, latency, callback)
+    stream.on_close = self.writer.close
+
+    return stream
+
+  def _consume(self, data):
+    self.writer.write(data)
+
+class CallbackStatus(object):
+  """ Stands for sounddevice.CallbackFlags in simulated streams, which never underflow. """
+  output_underflow = False
+
+  def __bool__(self):
+    return False
+
+class SimulatedStream(object):
+  """ An output stream with no device behind it. Blocks are handed to consume, either from write() or, in callback mode, from a thread that pulls them from the callback. """
+  def __init__(self, consume, channels, dtype, sample_rate, blocksize, latency, callback=None, realtime=True):
+    self.consume     = consume
+    self.channels    = channels
+    self.dtype       = dtype
+    self.samplerate  = sample_rate
+    self.blocksize   = blocksize
+    self.callback    = callback
+    self.realtime    = realtime
+    self.latency     = latency if isinstance(latency, (int, float)) else (blocksize or DEFAULT_BLOCKSIZE) / sample_rate
+    self.on_close    = None
+    self.ready       = None # Without realtime, the callback is only called while ready(frames) is true
+
+    self._notified   = threading.Event()
+
+    self.frames      = 0
+    self.active      = False
+    self._start_time = None
+    self._thread     = None
+
+  def start(self):
+    self.active = True
+    self._start_time = time.monotonic()
+    
+    if self.callback is not None:
+      self._thread = threading.Thread(name='SimulatedStreamT', target=self._pull)
+      self._thread.start()
+
+  def pull_when(self, ready):
+    """ Without realtime there is no clock to pull at, so blocks are only pulled while ready(frames) says the source has one. The source calls notify() when that may have changed. """
+    self.ready = ready
+
+  def notify(self):
+    self._notified.set()
+
+  def _pull(self):
+    frames = self.blocksize or DEFAULT_BLOCKSIZE
+    outdata = np.zeros((frames, self.channels), dtype=self.dtype)
+    status = CallbackStatus()
+
+    while self.active:
+      if not self.realtime and self.ready is not None:
+        self._notified.clear()
+        if not self.ready(frames):
+          self._notified.wait(POLL_INTERVAL)
+          continue
+
+      self.callback(outdata, frames, None, status)
+      self._played(outdata)
+
+  def write(self, data):
+    self._played(data)
+
+  def _played(self, data):
+    self.consume(data)
+    self.frames += len(data)
+
+    if self.realtime:
+      ahead = self._start_time + self.frames / self.samplerate - self.latency - time.monotonic()
+      if ahead > 0:
+        time.sleep(ahead)
+    else:
+      time.sleep(0) # Let the other threads run
+
+  def close(self):
+    self.active = False
+    self._notified.set()
+    if self._thread is not None and self._thread is not threading.current_thread():
+      self._thread.join()
+
+    if self.on_close:
+      self.on_close()
@@ -0,0 +1,42 @@
+from unittest import TestCase, main
+
+import os
+import tempfile
+import time
+import numpy as np
+
+from scipy.io import wavfile
+from synth.backends import (NullBackend, FileBackend)
+from synth.player import (Player, MODE_BLOCKING)
+
+class BackendsTest(TestCase):
+  def test_nullBackend_RealtimeShouldConsumeAtTheSampleRate(self):
+    player = Player(mode=MODE_BLOCKING, latency=0.0, backend=NullBackend(realtime=True))
+
+    start = time.monotonic()
+    for _ in range(5):
+      player.play_sample(np.ones(4410))
+    elapsed = time.monotonic() - start
+    player.terminate()
+
+    self.assertGreaterEqual(elapsed, 0.45)
+
+  def test_fileBackend_ShouldWriteEveryPlayedBlock(self):
+    fd, path = tempfile.mkstemp(suffix='.wav')
+    os.close(fd)
+
+    try:
+      player = Player(mode=MODE_BLOCKING, backend=FileBackend(path))
+      for _ in range(3):
+        player.play_sample(np.ones(1024))
+      player.terminate()
+
+      _, data = wavfile.read(path)
+    finally:
+      os.remove(path)
+
+    self.assertEqual(len(data), 3072)
+    np.testing.assert_allclose(data[player.limiter.chunk:], player.volume)
+
+if __name__ == "__main__":
+  main()
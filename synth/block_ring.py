@@ -0,0 +1,99 @@
+import threading
+import time
+import numpy as np
+
+class BlockRing(object):
+  """ A lock-free single-producer/single-consumer ring of preallocated sample blocks.
+
+  The producer fills the slot returned by write_slot() and publishes it with commit(); the consumer gets it with read_slot() and gives it back with release(). Each side only ever moves its own counter, so no locks are needed and no memory is allocated per block. Waiting sides sleep on an event the other side sets when it moves its counter.
+
+  At most depth blocks are queued. The ring has capacity slots (depth by default), so the producer can change depth up to capacity while the consumer reads. """
+  def __init__(self, depth=2, block_size=1024, dtype=np.float64, capacity=None):
+    self.depth = depth
+    self.capacity = depth if capacity is None else capacity
+    self.block_size = block_size
+
+    self.slots = np.zeros((self.capacity, block_size), dtype=dtype)
+    self.lengths = [0] * self.capacity
+    self._views = [self.slots[i] for i in range(self.capacity)]
+
+    self.write_count = 0
+    self.read_count = 0
+
+    self._committed = threading.Event()
+    self._released = threading.Event()
+
+  def qsize(self):
+    """ Number of committed blocks waiting to be read. """
+    return self.write_count - self.read_count
+
+  def write_slot(self):
+    """ Returns the next free slot to be filled, or None if the ring is full. """
+    if not self._writable():
+      return None
+
+    return self._views[self.write_count % self.capacity]
+
+  def commit(self, length=None):
+    """ Publishes the slot returned by write_slot() with its first length samples (a length of 0 is a valid, empty, block). """
+    self.lengths[self.write_count % self.capacity] = self.block_size if length is None else length
+    self.write_count += 1
+    self._committed.set()
+
+  def push(self, block):
+    """ Copies block into the next free slot and commits it. Returns False if the ring is full. """
+    slot = self.write_slot()
+    if slot is None:
+      return False
+
+    length = min(len(block), self.block_size)
+    slot[:length] = block[:length]
+    self.commit(length)
+
+    return True
+
+  def read_slot(self):
+    """ Returns the oldest committed block, or None if the ring is empty. The block stays valid until release() is called. """
+    if not self._readable():
+      return None
+
+    index = self.read_count % self.capacity
+    length = self.lengths[index]
+
+    return self._views[index] if length == self.block_size else self._views[index][:length]
+
+  def release(self):
+    """ Gives the block returned by read_slot() back to the producer. """
+    self.read_count += 1
+    self._released.set()
+
+  def set_depth(self, depth):
+    """ Changes how many blocks can be queued, between 1 and capacity. Only the producer should call it. """
+    self.depth = max(1, min(depth, self.capacity))
+
+  def wait_writable(self, timeout=None):
+    """ Waits until there is a free slot. Returns False on timeout. """
+    return self._wait(self._writable, self._released, timeout)
+
+  def wait_readable(self, timeout=None):
+    """ Waits until there is a committed block. Returns False on timeout. """
+    return self._wait(self._readable, self._committed, timeout)
+
+  def _writable(self):
+    return self.write_count - self.read_count < self.depth
+
+  def _readable(self):
+    return self.write_count != self.read_count
+
+  def _wait(self, ready, event, timeout):
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+      # Cleared before checking, so a counter moved in between still wakes us
+      event.clear()
+      if ready():
+        return True
+
+      remaining = None if deadline is None else deadline - time.monotonic()
+      if remaining is not None and remaining <= 0:
+        return False
+      event.wait(remaining)
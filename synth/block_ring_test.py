@@ -0,0 +1,98 @@
+from unittest import TestCase, main
+
+import threading
+import time
+import numpy as np
+
+from synth.block_ring import BlockRing
+
+class BlockRingTest(TestCase):
+  def test_push_ShouldFailWhenTheRingIsFull(self):
+    ring = BlockRing(depth=2, block_size=4)
+
+    self.assertTrue(ring.push(np.ones(4)))
+    self.assertTrue(ring.push(np.ones(4)))
+    self.assertFalse(ring.push(np.ones(4)))
+    self.assertEqual(ring.qsize(), 2)
+
+  def test_setDepth_ShouldLimitQueuedBlocks(self):
+    ring = BlockRing(depth=2, block_size=4, capacity=4)
+
+    ring.set_depth(3)
+    for i in range(3):
+      self.assertTrue(ring.push(np.full(4, i)))
+    self.assertFalse(ring.push(np.ones(4)))
+
+    ring.set_depth(1)
+    for i in range(3):
+      np.testing.assert_array_equal(ring.read_slot(), [i] * 4)
+      ring.release()
+    self.assertTrue(ring.push(np.ones(4)))
+    self.assertFalse(ring.push(np.ones(4)))
+
+  def test_readSlot_ShouldReturnBlocksInOrder(self):
+    ring = BlockRing(depth=2, block_size=4)
+
+    for i in range(5):
+      ring.push(np.full(4, i))
+      np.testing.assert_array_equal(ring.read_slot(), [i] * 4)
+      ring.release()
+
+    self.assertIsNone(ring.read_slot())
+
+  def test_readSlot_ShouldHonorCommittedLength(self):
+    ring = BlockRing(depth=2, block_size=4)
+
+    ring.push(np.arange(2))
+    ring.push([])
+
+    np.testing.assert_array_equal(ring.read_slot(), [0, 1])
+    ring.release()
+    self.assertEqual(len(ring.read_slot()), 0)
+
+  def test_readSlot_ShouldReuseThePreallocatedSlots(self):
+    ring = BlockRing(depth=2, block_size=4)
+
+    ring.push(np.ones(4))
+    first = ring.read_slot()
+    ring.release()
+    ring.push(np.ones(4))
+    ring.release()
+    ring.push(np.ones(4))
+
+    self.assertIs(ring.read_slot(), first)
+
+  def test_waitReadable_ShouldTimeoutOnEmptyRing(self):
+    self.assertFalse(BlockRing().wait_readable(timeout=0.01))
+
+  def test_waitReadable_ShouldWakeOnCommit(self):
+    ring = BlockRing(depth=2, block_size=4)
+    producer = threading.Timer(0.05, ring.push, (np.ones(4),))
+    producer.start()
+
+    start = time.monotonic()
+    self.assertTrue(ring.wait_readable(timeout=5.0))
+    self.assertLess(time.monotonic() - start, 1.0)
+    producer.join()
+
+  def test_producerConsumer_ShouldTransferEveryBlock(self):
+    ring = BlockRing(depth=3, block_size=8)
+    received = []
+
+    def consume():
+      for _ in range(100):
+        ring.wait_readable()
+        received.append(ring.read_slot()[0])
+        ring.release()
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    for i in range(100):
+      ring.wait_writable()
+      ring.push(np.full(8, i))
+    consumer.join()
+
+    self.assertEqual(received, list(range(100)))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,44 @@
+import contextlib
+import functools
+import operator
+import numpy as np
+
+UFUNC_BUFSIZE = 64 # Elements, NumPy's default is 8192
+
+@contextlib.contextmanager
+def ufunc_buffers(size=UFUNC_BUFSIZE):
+  """ Makes NumPy allocate ufunc buffers of size elements, in this thread, until the context exits.
+
+  NumPy sets up a buffer of bufsize elements per operand for ufuncs that broadcast, even when no cast is needed, so with the default size every broadcasting operation on a block allocates up to 64KB. Keep the operands in the same dtype, as casts are then done size elements at a time. """
+  with np.errstate():
+    np.setbufsize(size)
+    yield
+
+class BufferPool(object):
+  """ Named work buffers, allocated once and reused from block to block.
+
+  get() only allocates when a buffer is first requested or has to grow; allocations counts how many times that happened, so a render loop can check it does not allocate per block. """
+  def __init__(self, dtype=np.float64):
+    self.dtype = dtype
+    self.allocations = 0
+
+    self._buffers = {}
+
+  def get(self, name, shape, dtype=None):
+    """ Returns a buffer with the given shape, a view of the one kept under name. Its contents are whatever was last written to it. """
+    dtype = self.dtype if dtype is None else dtype
+    shape = shape if isinstance(shape, tuple) else (shape,)
+    size = functools.reduce(operator.mul, shape, 1)
+
+    buffer = self._buffers.get(name)
+    if buffer is None or buffer.size < size or buffer.dtype != dtype:
+      buffer = np.empty(size, dtype=dtype)
+      self._buffers[name] = buffer
+      self.allocations += 1
+
+    return buffer[:size].reshape(shape)
+
+  def zeros(self, name, shape, dtype=None):
+    buffer = self.get(name, shape, dtype)
+    buffer.fill(0)
+    return buffer
@@ -0,0 +1,115 @@
+import math
+import numpy as np
+
+from .buffers import ufunc_buffers
+
+CEILING    = 0.9  # About -1dBFS
+MAX_FRAMES = 4096 # Longest block the limiter allocates for up front
+
+def soft_clip(samples, ceiling=CEILING, out=None):
+  """ Saturates samples smoothly towards +-ceiling (ceiling * tanh(samples / ceiling)). Quiet samples are left almost untouched. """
+  out = samples if out is None else out
+  np.multiply(samples, 1.0 / ceiling, out=out, casting='same_kind')
+  np.tanh(out, out=out)
+  out *= ceiling
+  return out
+
+class Limiter(object):
+  """ Streaming look-ahead peak limiter for the master bus.
+
+  Samples are delayed by lookahead seconds, so the gain can start going down before a peak reaches the output. The stream is cut in chunks of that length: the gain ramps linearly over each chunk, to a value low enough for both the chunk and the one after it, and comes back up by release_db every release seconds. Every output sample stays under ceiling, and the cost of a block is one pass over it plus a few operations per chunk.
+
+  The work arrays are allocated for blocks of up to max_frames samples, and only grow if a longer block comes, so process() does not allocate on the audio path. """
+  def __init__(self, sample_rate=44100, ceiling=CEILING, lookahead=0.0015, release=0.1, release_db=20.0, soft_clip=False, dtype=np.float32, max_frames=MAX_FRAMES):
+    self.ceiling   = ceiling
+    self.soft_clip = soft_clip
+    self.dtype     = dtype
+    self.chunk     = max(int(round(lookahead * sample_rate)), 1)
+
+    self.log_ceiling = math.log(ceiling)
+    self.log_release = math.log(10.0) * release_db / 20 * self.chunk / max(release * sample_rate, 1.0) # Per chunk
+    self.log_gain    = 0.0 # Gain at the start of the next block, in log domain
+
+    self._buffer = np.zeros(self.chunk, dtype=dtype) # Delay line followed by the current block
+    self._ramp   = np.arange(self.chunk, dtype=dtype) / self.chunk
+    self._index  = np.arange(self.chunk, dtype=dtype)
+    self._peak   = np.zeros(self.chunk, dtype=dtype) # abs() of the lookahead
+    self._allocate(max_frames)
+
+  def _allocate(self, frames):
+    """ Sizes the work arrays for blocks of up to frames samples, keeping the delayed samples. """
+    chunks = -(-frames // self.chunk) # Output chunks, the lookahead adds one to the peaks
+
+    buffer = np.zeros(frames + self.chunk, dtype=self.dtype)
+    buffer[:self.chunk] = self._buffer[:self.chunk]
+    self._buffer = buffer
+    self._output = np.zeros(frames, dtype=self.dtype)
+
+    self._starts    = np.arange(0, frames, self.chunk)
+    self._peaks     = np.zeros(chunks + 1, dtype=self.dtype) # Peaks, then log domain gain targets
+    self._limits    = np.zeros(chunks, dtype=self.dtype)
+    self._steps     = np.arange(1, chunks + 1, dtype=self.dtype) * self.log_release
+    self._log_gains = np.zeros(chunks + 1, dtype=self.dtype)
+    self._gains     = np.zeros(chunks + 1, dtype=self.dtype)
+    self._deltas    = np.zeros(chunks, dtype=self.dtype)
+
+  def reset(self):
+    """ Forgets the delayed samples and the gain reduction, e.g. when the stream stops. """
+    self._buffer[:self.chunk] = 0.0
+    self.log_gain = 0.0
+
+  def process(self, samples, gain=1.0):
+    """ Limits samples scaled by gain. Returns as many samples as given, delayed by the lookahead, in a buffer that is reused by the next call. """
+    frames = len(samples)
+    if len(self._output) < frames:
+      self._allocate(frames)
+
+    with ufunc_buffers():
+      return self._process(samples, gain, frames)
+
+  def _process(self, samples, gain, frames):
+    chunk = self.chunk
+    chunks = -(-frames // chunk)
+    buffer = self._buffer[:frames + chunk]
+    np.multiply(samples, gain, out=buffer[chunk:], casting='same_kind')
+
+    # Highest gain (in log domain) each chunk of the output allows, plus the lookahead past this block
+    output = self._output[:frames]
+    np.abs(buffer[:frames], out=output)
+    targets = self._peaks[:chunks + 1]
+    np.maximum.reduceat(output, self._starts[:chunks], out=targets[:chunks])
+    targets[chunks] = np.abs(buffer[frames:], out=self._peak).max()
+    np.maximum(targets, self.ceiling, out=targets)
+    np.log(targets, out=targets)
+    np.subtract(self.log_ceiling, targets, out=targets)
+
+    # Each chunk ends on the gain of the lowest of it and its successor, rising at most log_release per chunk
+    limits = np.minimum(targets[:-1], targets[1:], out=self._limits[:chunks])
+    steps = self._steps[:chunks]
+    limits -= steps
+    np.minimum.accumulate(limits, out=limits)
+    np.minimum(limits, self.log_gain, out=limits)
+    log_gains = self._log_gains[:chunks + 1]
+    log_gains[0] = self.log_gain
+    np.add(steps, limits, out=log_gains[1:])
+    gains = np.exp(log_gains, out=self._gains[:chunks + 1])
+    self.log_gain = min(float(log_gains[-1]), 0.0)
+
+    full = frames // chunk
+    ramps = output[:full * chunk].reshape(full, chunk)
+    deltas = np.subtract(gains[1:full + 1], gains[:full], out=self._deltas[:full])
+    np.multiply(self._ramp, deltas[:, np.newaxis], out=ramps)
+    ramps += gains[:full, np.newaxis]
+    if full * chunk < frames:
+      rest = frames - full * chunk
+      tail = output[full * chunk:]
+      np.multiply(self._index[:rest], float(gains[full + 1] - gains[full]) / rest, out=tail)
+      tail += float(gains[full])
+
+    output *= buffer[:frames]
+    buffer[:chunk] = buffer[frames:] # Delay line for the next block
+
+    if self.soft_clip:
+      soft_clip(output, self.ceiling)
+
+    return output
@@ -0,0 +1,75 @@
+from unittest import TestCase, main
+
+import tracemalloc
+import numpy as np
+
+from synth.dynamics import (Limiter, soft_clip)
+
+def burst(loud=3.0):
+  """ A quiet sine with a loud section in the middle. """
+  t = np.arange(60000) * 0.05
+  return np.where((t > 1000) & (t < 1250), loud, 0.3) * np.sin(t)
+
+def process(limiter, samples, block_size):
+  return np.concatenate([limiter.process(samples[i:i + block_size]).copy() for i in range(0, len(samples), block_size)])
+
+class LimiterTest(TestCase):
+  def test_process_ShouldNeverExceedCeiling(self):
+    for block_size in (37, 1024, 4096):
+      limiter = Limiter(ceiling=0.8)
+      output = process(limiter, burst(), block_size)
+
+      self.assertLessEqual(np.abs(output).max(), 0.8 + 1e-6)
+
+  def test_process_QuietSignalShouldOnlyBeDelayed(self):
+    samples = burst(loud=0.3)
+    limiter = Limiter()
+    output = process(limiter, samples, 1024)
+
+    np.testing.assert_allclose(output[limiter.chunk:], samples[:-limiter.chunk], atol=1e-6)
+
+  def test_process_GainShouldRecoverAfterPeak(self):
+    samples = burst()
+    limiter = Limiter()
+    output = process(limiter, samples, 1024)
+
+    np.testing.assert_allclose(output[-5000:], samples[-5000 - limiter.chunk:-limiter.chunk], atol=1e-6)
+
+  def test_process_ShouldScaleByGain(self):
+    limiter = Limiter()
+    output = limiter.process(np.ones(1024), 0.5)
+
+    np.testing.assert_allclose(output[limiter.chunk:], 0.5)
+
+  def test_process_ShouldNotAllocatePerBlock(self):
+    limiter = Limiter()
+    samples = burst().astype(np.float32)
+    limiter.process(samples[:4096])
+
+    tracemalloc.start()
+    try:
+      for start in range(4096, 40960, 4096):
+        limiter.process(samples[start:start + 4096])
+      peak = tracemalloc.get_traced_memory()[1]
+    finally:
+      tracemalloc.stop()
+
+    # One float32 block of 4096 samples takes 16KB, what is left are NumPy scalars, views and the ufunc buffer context
+    self.assertLess(peak, 8 * 1024)
+
+  def test_process_LongerBlocksShouldGrowTheBuffers(self):
+    limiter = Limiter(ceiling=0.8, max_frames=256)
+    output = process(limiter, burst(), 1000)
+
+    self.assertLessEqual(np.abs(output).max(), 0.8 + 1e-6)
+    self.assertEqual(len(limiter._output), 1000)
+
+  def test_softClip_ShouldStayUnderCeiling(self):
+    samples = np.linspace(-10, 10, 101)
+    clipped = soft_clip(samples.copy(), 0.5)
+
+    self.assertLessEqual(np.abs(clipped).max(), 0.5)
+    self.assertAlmostEqual(soft_clip(np.array([0.01]), 0.5)[0], 0.01, places=4)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,95 @@
+import math
+import numpy as np
+from .parameter import Parameter
+
+STAGE_IDLE    = 0
+STAGE_ATTACK  = 1
+STAGE_DECAY   = 2
+STAGE_SUSTAIN = 3
+STAGE_RELEASE = 4
+
+SILENCE = 1e-4 # -80dB
+
+class EnvelopeBank(object):
+  """ ADSR envelopes of all voices, kept in NumPy arrays and advanced one block at a time for every active voice at once.
+
+  Attack and decay are linear and release is exponential, ending when the level drops below the silence threshold. Levels are computed per sample, stage changes included, so the result does not depend on the block size. """
+  def __init__(self, num_voices, sample_rate=44100, silence=SILENCE, dtype=np.float64):
+    self.sample_rate = sample_rate
+    self.silence     = silence
+
+    self.attack  = Parameter('attack', min_value=0.0, max_value=2.0, init_value=0.0025, label_format="{0:.3f}s")
+    self.decay   = Parameter('decay', min_value=0.0, max_value=2.0, init_value=0.05, label_format="{0:.3f}s")
+    self.sustain = Parameter('sustain', init_value=0.8)
+    self.release = Parameter('release', min_value=0.0, max_value=4.0, init_value=0.05, label_format="{0:.3f}s")
+
+    self.parameters = {
+      'attack': self.attack,
+      'decay': self.decay,
+      'sustain': self.sustain,
+      'release': self.release
+    }
+
+    self.stage = np.zeros(num_voices, dtype=int)
+    self.level = np.zeros(num_voices, dtype=dtype)
+
+  def trigger(self, voice_idx):
+    """ Starts the attack from the current level, so retriggered voices do not click. """
+    self.stage[voice_idx] = STAGE_ATTACK
+
+  def release_voice(self, voice_idx):
+    self.stage[voice_idx] = STAGE_RELEASE
+
+  def reset(self, voice_idx):
+    self.stage[voice_idx] = STAGE_IDLE
+    self.level[voice_idx] = 0.0
+
+  def advance(self, voices, frames, elapsed, buffers=None):
+    """ Advances the envelopes of voices by frames samples. elapsed holds [1, 2, ..., frames]. With buffers (a BufferPool), the per sample arrays are taken from it instead of allocated.
+
+    Returns (gains, finished): the per sample gains with shape (len(voices), frames) and the voices whose release ended in this block. """
+    shape = (len(voices), frames)
+    gains = buffers.get('envelope_gains', shape) if buffers else np.empty(shape)
+    work = buffers.get('envelope_work', shape) if buffers else np.empty(shape)
+
+    stage = self.stage[voices]
+    start = self.level[voices]
+
+    # Python floats keep the dtype of the arrays they are combined with, NumPy scalars would upcast them and make the ufuncs buffer
+    sustain = float(self.sustain.get_snapshot())
+    attack_rate = 1.0 / max(float(self.attack.get_snapshot()) * self.sample_rate, 1.0)
+    decay_rate = (1.0 - sustain) / max(float(self.decay.get_snapshot()) * self.sample_rate, 1.0)
+    release_rate = math.log(self.silence) / max(float(self.release.get_snapshot()) * self.sample_rate, 1.0)
+
+    # Attack rises until it meets the decay line, which starts at 1.0 on the peak and stops at the sustain level
+    attacking = stage == STAGE_ATTACK
+    peak = np.where(attacking, (1.0 - start) / attack_rate, 0.0)
+    np.multiply(elapsed, attack_rate, out=gains)
+    gains += np.where(attacking, start, np.inf)[:, np.newaxis]
+    np.subtract(elapsed, peak[:, np.newaxis], out=work)
+    work *= -decay_rate
+    work += np.where(attacking, 1.0, start)[:, np.newaxis]
+    np.maximum(work, sustain, out=work)
+    np.minimum(gains, work, out=gains)
+
+    releasing = stage == STAGE_RELEASE
+    if releasing.any():
+      np.multiply(elapsed, release_rate, out=work)
+      np.exp(work, out=work)
+      work *= start[:, np.newaxis]
+      np.copyto(gains, work, where=releasing[:, np.newaxis])
+    np.copyto(gains, 0.0, where=(stage == STAGE_IDLE)[:, np.newaxis])
+
+    end = gains[:, -1]
+    next_stage = stage.copy()
+    next_stage[attacking & (peak <= frames)] = STAGE_DECAY
+    next_stage[(next_stage == STAGE_DECAY) & (end <= sustain)] = STAGE_SUSTAIN
+    
+    finished = releasing & (end < self.silence)
+    next_stage[finished] = STAGE_IDLE
+    end[finished] = 0.0
+
+    self.stage[voices] = next_stage
+    self.level[voices] = end
+
+    return gains, voices[finished]
@@ -0,0 +1,60 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from synth.envelope import (EnvelopeBank, STAGE_DECAY, STAGE_SUSTAIN, STAGE_IDLE, SILENCE)
+
+class EnvelopeBankTest(TestCase):
+  def _create_envelopes(self, attack=0.01, decay=0.01, sustain=0.5, release=0.01):
+    envelopes = EnvelopeBank(4, sample_rate=1000)
+    envelopes.attack.set_relative(attack / envelopes.attack.max_value)
+    envelopes.decay.set_relative(decay / envelopes.decay.max_value)
+    envelopes.sustain.set_relative(sustain)
+    envelopes.release.set_relative(release / envelopes.release.max_value)
+
+    return envelopes
+
+  def _advance(self, envelopes, voices, frames):
+    return envelopes.advance(np.array(voices), frames, np.arange(1, frames + 1))
+
+  def test_advance_ShouldRiseDecayAndHoldTheSustainLevel(self):
+    envelopes = self._create_envelopes()
+    envelopes.trigger(0)
+
+    gains, finished = self._advance(envelopes, [0], 40)
+
+    np.testing.assert_allclose(gains[0, :10], np.arange(1, 11) / 10)
+    np.testing.assert_allclose(gains[0, 10:20], 1.0 - np.arange(1, 11) / 20)
+    np.testing.assert_allclose(gains[0, 20:], 0.5)
+    self.assertEqual(envelopes.stage[0], STAGE_SUSTAIN)
+    self.assertEqual(len(finished), 0)
+
+  def test_advance_ShouldNotDependOnTheBlockSize(self):
+    whole, split = self._create_envelopes(), self._create_envelopes()
+    whole.trigger(0)
+    split.trigger(0)
+
+    expected, _ = self._advance(whole, [0], 15)
+    first, _ = self._advance(split, [0], 7)
+    second, _ = self._advance(split, [0], 8)
+
+    np.testing.assert_allclose(np.concatenate([first[0], second[0]]), expected[0])
+    self.assertEqual(split.stage[0], STAGE_DECAY)
+
+  def test_advance_ReleasedVoiceShouldFinishOnceSilent(self):
+    envelopes = self._create_envelopes()
+    envelopes.trigger(1)
+    self._advance(envelopes, [1], 40)
+    envelopes.release_voice(1)
+
+    gains, finished = self._advance(envelopes, [1], 5)
+    self.assertTrue(np.all(np.diff(gains[0]) < 0))
+    self.assertEqual(len(finished), 0)
+
+    gains, finished = self._advance(envelopes, [1], 20)
+    self.assertLess(gains[0, -1], SILENCE)
+    self.assertEqual(finished.tolist(), [1])
+    self.assertEqual(envelopes.stage[1], STAGE_IDLE)
+
+if __name__ == "__main__":
+  main()
@@ -13,6 +13,8 @@ class EventQueue(Queue):
       )
 
 class Event(object):
+  __slots__ = ('type', 'item', 'timestamp', 'ancestor')
+
   def __init__(self, item, event_type, **kwargs):
     self.type = event_type
     self.item = item
@@ -0,0 +1,127 @@
+import logging
+import numpy as np
+import midi
+
+from .dynamics import (CEILING, Limiter)
+from .oscilator import default_oscilators
+from .sampler import Sampler
+from .scheduler import EventScheduler
+from .wav import WavWriter
+
+LOGGER_NAME = 'OfflineRenderer'
+
+class OfflineRenderer(object):
+  """ Renders timed midi messages as fast as the CPU allows, without an audio device.
+
+  Events are (time, MidiMessage) tuples, with time in seconds from the start of the render. Note events take effect on the exact sample they are scheduled to. The output goes through the same master limiter as the Player's, with its lookahead delay taken out. """
+  def __init__(self, oscilators=None, sample_rate=44100, chunk_size=65536, num_voices=8, gain=0.5, workers=0, ceiling=CEILING, soft_clip=False, log=None):
+    self.log = log.getChild(LOGGER_NAME) if log else logging.getLogger(LOGGER_NAME)
+
+    self.oscilators = oscilators if oscilators is not None else default_oscilators()
+    self.sampler    = Sampler(sample_rate=sample_rate, sample_size=chunk_size, num_voices=num_voices, workers=workers, log=self.log)
+    self.gain       = gain
+    self.limiter    = Limiter(sample_rate, ceiling, soft_clip=soft_clip, max_frames=chunk_size)
+
+  def close(self):
+    self.sampler.close()
+
+  @property
+  def sample_rate(self):
+    return self.sampler.sample_rate
+
+  def render(self, events, duration=None, path=None):
+    """ Renders events until duration seconds (or the last event) into a float32 array, or streams it into a WAV file at path.
+
+    Lists of events are sorted first. Any other iterable, such as a midi.MidiFile, must already be sorted by time; when rendering it to a file it is read as the render goes.
+
+    Returns the rendered array, or the number of frames written when path is given. """
+    if isinstance(events, (list, tuple)):
+      events = sorted(events, key=lambda e: e[0])
+
+    if path is None:
+      if duration is None:
+        events = list(events)
+        duration = events[-1][0] if events else 0.0
+
+      output = np.zeros(int(round(duration * self.sample_rate)), dtype=np.float32)
+      self._render(events, len(output), output.__setitem__)
+      return output
+
+    total_frames = None if duration is None else int(round(duration * self.sample_rate))
+    with WavWriter(path, self.sample_rate) as writer:
+      self._render(events, total_frames, lambda span, chunk: writer.write(chunk))
+      return writer.frames
+
+  def _render(self, events, total_frames, sink):
+    """ Renders total_frames samples, or up to the last event if it is None, scheduling events as their block comes. """
+    scheduler = EventScheduler(self.sample_rate)
+    events = iter(events)
+    upcoming = next(events, None)
+    last_time = 0.0
+
+    delay = self.limiter.chunk
+    silence = np.zeros(max(self.sampler.sample_size, 2 * delay), dtype=np.float32)
+    staged = np.zeros(self.sampler.sample_size + 2 * delay, dtype=np.float32)
+    staged_frames = 0
+    emitted = -delay # Position of the next limited sample, the first delay ones come from before the start
+    position = 0
+    self.limiter.reset()
+
+    def limit(samples, end=None):
+      """ Limits samples and sends what comes out, up to end. Only whole lookahead chunks are limited at once, so the result does not depend on the chunk size. """
+      nonlocal staged_frames, emitted
+      staged[staged_frames:staged_frames + len(samples)] = samples
+      staged_frames += len(samples)
+      frames = staged_frames - staged_frames % delay
+      if frames == 0:
+        return
+
+      limited = self.limiter.process(staged[:frames], self.gain)
+      start = max(-emitted, 0)
+      stop = frames if end is None else min(frames, end - emitted)
+      if start < stop:
+        sink(slice(emitted + start, emitted + stop), limited[start:stop])
+
+      emitted += frames
+      staged_frames -= frames
+      staged[:staged_frames] = staged[frames:frames + staged_frames]
+
+    while total_frames is None or position < total_frames:
+      frames = self.sampler.sample_size if total_frames is None else min(self.sampler.sample_size, total_frames - position)
+
+      end_time = (position + frames) / self.sample_rate
+      while upcoming is not None and upcoming[0] < end_time:
+        last_time, item = upcoming
+        scheduler.schedule(item, last_time)
+        upcoming = next(events, None)
+
+      if upcoming is None and total_frames is None:
+        total_frames = int(round(last_time * self.sample_rate))
+        frames = min(frames, total_frames - position)
+        if frames <= 0:
+          break
+
+      block_events = scheduler.collect(position / self.sample_rate, frames)
+      master = self.sampler.get_master_split(frames, block_events, self.process_message)
+
+      limit(master if len(master) > 0 else silence[:frames])
+      position += frames
+
+    # Flush the lookahead and the last partial chunk
+    limit(silence[:delay + (-staged_frames) % delay], position)
+
+    self.log.debug(f'Rendered {position} frames')
+
+  def process_message(self, item):
+    message_type = item.status & 0xF0 # Every channel plays the same patch
+    if message_type == midi.ST_NOTE_ON:
+      self.note_on(item.data1, item.data2)
+    if message_type == midi.ST_NOTE_OFF:
+      self.note_off(item.data1)
+
+  def note_on(self, note_number, velocity=127):
+    freq = midi.midi_number_to_freq(note_number)
+    self.sampler.note_on(note_number, (self.oscilators, freq), velocity / 127)
+
+  def note_off(self, note_number):
+    self.sampler.note_off(note_number)
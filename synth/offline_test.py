@@ -0,0 +1,94 @@
+from unittest import TestCase, main
+
+import os
+import tempfile
+import numpy as np
+
+from midi import (note_on, note_off)
+from scipy.io import wavfile
+from synth.dynamics import CEILING
+from synth.envelope import SILENCE
+from synth.offline import OfflineRenderer
+
+EVENTS = [
+  (0.25, note_on('A', 4, 127)),
+  (0.5, note_on('C', 5, 127)),
+  (1.0, note_off('A', 4, 127)),
+  (1.5, note_off('C', 5, 127)),
+]
+
+class OfflineRendererTest(TestCase):
+  def test_render_ShouldRenderTheWholeDuration(self):
+    output = OfflineRenderer(chunk_size=4096).render(EVENTS, duration=2.0)
+
+    self.assertEqual(output.dtype, np.float32)
+    self.assertEqual(len(output), 88200)
+
+  def test_render_NotesShouldStartOnTheirSampleAndStopAfterTheirRelease(self):
+    renderer = OfflineRenderer(chunk_size=4096)
+    release_frames = int(renderer.sampler.envelopes.release.get() * 44100)
+
+    output = renderer.render(EVENTS, duration=2.0)
+
+    self.assertFalse(np.any(output[:11025]))
+    self.assertTrue(np.any(output[11025:11030]))
+    self.assertTrue(np.any(output[66150:66160]))
+    self.assertFalse(np.any(output[66150 + release_frames + 4096:]))
+    self.assertFalse(renderer.sampler.has_voices())
+
+  def test_render_ShouldNotDependOnChunkSize(self):
+    small = OfflineRenderer(chunk_size=1000).render(EVENTS)
+    large = OfflineRenderer(chunk_size=65536).render(EVENTS)
+
+    # Voices are freed at the end of the chunk where their release becomes inaudible
+    np.testing.assert_allclose(small, large, atol=SILENCE)
+
+  def test_render_ChordsShouldStayUnderTheCeiling(self):
+    chord = [(0.0, note_on(note, 4, 127)) for note in ('C', 'E', 'G')] + [(0.5, note_off(note, 4, 127)) for note in ('C', 'E', 'G')]
+    output = OfflineRenderer(chunk_size=1000).render(chord, duration=1.0)
+
+    self.assertEqual(len(output), 44100)
+    self.assertLessEqual(np.abs(output).max(), CEILING + 1e-6)
+    self.assertGreater(np.abs(output).max(), CEILING / 2)
+
+  def test_render_ShouldWriteAFloatWavFile(self):
+    expected = OfflineRenderer().render(EVENTS)
+    fd, path = tempfile.mkstemp(suffix='.wav')
+    os.close(fd)
+
+    try:
+      frames = OfflineRenderer().render(EVENTS, path=path)
+      sample_rate, actual = wavfile.read(path)
+    finally:
+      os.remove(path)
+
+    self.assertEqual(frames, len(expected))
+    self.assertEqual(sample_rate, 44100)
+    np.testing.assert_array_equal(actual, expected)
+
+  def test_render_ShouldReadIterablesLazily(self):
+    expected = OfflineRenderer().render(EVENTS)
+    consumed = []
+    def events():
+      for event in EVENTS:
+        consumed.append(event)
+        yield event
+
+    fd, path = tempfile.mkstemp(suffix='.wav')
+    os.close(fd)
+
+    try:
+      frames = OfflineRenderer().render(events(), path=path)
+      _, actual = wavfile.read(path)
+
+      del consumed[:]
+      OfflineRenderer(chunk_size=4096).render(events(), duration=0.3, path=path)
+    finally:
+      os.remove(path)
+
+    self.assertEqual(frames, len(expected))
+    np.testing.assert_array_equal(actual, expected)
+    self.assertEqual(len(consumed), 2) # Up to the first event after the end
+
+if __name__ == "__main__":
+  main()
@@ -1,6 +1,7 @@
 #!/usr/bin/python
 import math
 from .parameter import Parameter
+from .waveform import WAVEFORMS
 
 class BaseOscilator(object):
   def __init__(self, waveform, name="OSC"):
@@ -9,9 +10,14 @@ class BaseOscilator(object):
     self.waveform  = waveform
     self.parameters     = {}
 
+  def version(self):
+    """ Returns a key that changes whenever a parameter of this oscilator or of its waveform changes. """
+    return tuple(p.version for p in self.parameters.values()) + self.waveform.version()
+
 class Oscilator(BaseOscilator):
-  def __init__(self, waveform, name='OSC'):
+  def __init__(self, waveform, name='OSC', wavetable=False):
     super().__init__(waveform, name=name)
+    self.wavetable = wavetable
     self.volume = Parameter('volume')
     self.detune = Parameter('detune', min_value=-12, max_value=12)
     self.phase  = Parameter('phase', max_value=2 * math.pi, label_format=lambda x: f"{(x/math.pi):.2f}π")
@@ -23,8 +29,27 @@ class Oscilator(BaseOscilator):
     }
   
   def evaluate(self, t, freq):
-    detune = self.detune.get()
-    phase = self.phase.get()
+    return self.evaluate_cycles((freq + self.detune.get()) * t)
+
+  def evaluate_cycles(self, cycles):
+    """ Evaluates this oscilator at the given phases, in cycles (1.0 is a full period). The phase parameter is added as an offset. """
+    phase = self.phase.get() / (2 * math.pi)
     amplitude = self.volume.get()
     
-    return amplitude * self.waveform(2 * math.pi * (freq + detune) * t + phase)
+    if self.wavetable:
+      return amplitude * self.waveform.lookup(cycles + phase)
+
+    return amplitude * self.waveform(2 * math.pi * (cycles + phase))
+
+  def increment(self, freq, sample_rate):
+    """ Returns how much the phase (in cycles) advances per sample when playing freq. """
+    return (freq + self.detune.get()) / sample_rate
+
+def default_oscilators():
+  """ The default patch: one wavetable oscilator of each basic waveform. """
+  return [
+    Oscilator(name="Saw 1", waveform=WAVEFORMS['SAWTOOTH'], wavetable=True),
+    Oscilator(name="Triangle 1", waveform=WAVEFORMS['TRIANGLE'], wavetable=True),
+    Oscilator(name="Sinusoid 1", waveform=WAVEFORMS['SINE'], wavetable=True),
+    Oscilator(name="Square 1", waveform=WAVEFORMS['SQUARE'], wavetable=True),
+  ]
@@ -0,0 +1,147 @@
+import logging
+import multiprocessing
+import numpy as np
+
+from multiprocessing import (resource_tracker, shared_memory)
+
+LOGGER_NAME = 'ParallelRenderer'
+
+class SharedArray(object):
+  """ A NumPy array backed by a multiprocessing.shared_memory block. spec() describes it to another process, which maps it with attach(). """
+  def __init__(self, shape, dtype=np.float64):
+    self.shape = tuple(shape)
+    self.dtype = np.dtype(dtype)
+    self.memory = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(self.shape)) * self.dtype.itemsize))
+    self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.memory.buf)
+
+  def spec(self):
+    return (self.memory.name, self.shape, self.dtype.str)
+
+  def fits(self, shape):
+    return len(shape) == len(self.shape) and all(wanted <= available for wanted, available in zip(shape, self.shape))
+
+  def close(self):
+    del self.array
+    self.memory.close()
+    self.memory.unlink()
+
+def attach(spec, attached):
+  """ Maps a SharedArray described by spec in this process, caching the mapping in attached. """
+  name, shape, dtype = spec
+  if name not in attached:
+    memory = shared_memory.SharedMemory(name=name)
+    attached[name] = (memory, np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf))
+
+  return attached[name][1]
+
+def worker_main(connection):
+  """ Renders voice shards on request until it receives None. Inputs are read from, and the output written to, shared memory. """
+  from .sampler import render_wavetables
+
+  attached = {}
+  ramp = np.arange(0)
+
+  while True:
+    request = connection.recv()
+    if request is None:
+      break
+
+    specs, worker_idx, start, stop, frames, num_oscilators, table_width, with_gains = request
+    if len(ramp) < frames:
+      ramp = np.arange(frames)
+
+    tables      = attach(specs['tables'], attached)[:num_oscilators, :table_width]
+    params      = attach(specs['params'], attached)
+    phases      = attach(specs['phases'], attached)[start:stop, :num_oscilators]
+    increments  = attach(specs['increments'], attached)[start:stop, :num_oscilators]
+    gains       = attach(specs['gains'], attached)[start:stop, :frames] if with_gains else None
+    output      = attach(specs['output'], attached)
+
+    output[worker_idx, :frames] = render_wavetables(tables, params[0, :num_oscilators], params[1, :num_oscilators], phases, increments, ramp[:frames], gains)
+    connection.send(True)
+
+  for memory, array in attached.values():
+    del array
+    memory.close()
+
+class ParallelRenderer(object):
+  """ Renders wavetable voices on a pool of worker processes.
+
+  Each block, the parameter snapshot (tables, phase offsets and volumes) and the per voice phases, increments and gains are written once to shared memory; every worker renders a contiguous shard of the voices into its own row of a shared output buffer and the parent sums the rows. """
+  def __init__(self, workers=None, min_voices_per_worker=4, log=None):
+    self.log = log.getChild(LOGGER_NAME) if log else logging.getLogger(LOGGER_NAME)
+
+    self.num_workers = workers or multiprocessing.cpu_count()
+    self.min_voices_per_worker = min_voices_per_worker
+    
+    self.buffers = {}
+    self.connections = []
+    self.processes = []
+
+    # Workers must share our tracker, otherwise each one would try to clean up the shared blocks it attached to
+    resource_tracker.ensure_running()
+
+    for i in range(self.num_workers):
+      parent_end, worker_end = multiprocessing.Pipe()
+      process = multiprocessing.Process(name=f'SyRenderWorker{i}', target=worker_main, args=(worker_end,), daemon=True)
+      process.start()
+      
+      self.connections.append(parent_end)
+      self.processes.append(process)
+
+  def accepts(self, num_voices):
+    """ Whether it is worth sharding num_voices voices across processes. """
+    return num_voices >= 2 * self.min_voices_per_worker
+
+  def _buffer(self, name, shape):
+    """ Returns a shared array of at least shape, reallocating it if it grew. """
+    buffer = self.buffers.get(name)
+    if buffer is None or not buffer.fits(shape):
+      if buffer is not None:
+        buffer.close()
+      
+      buffer = SharedArray(shape)
+      self.buffers[name] = buffer
+    
+    return buffer.array
+
+  def render(self, tables, offset, volume, phases, increments, ramp, gains=None, out=None):
+    """ Same as sampler.render_wavetables, spread across the workers. The block is summed into out, when given. """
+    num_voices, num_oscilators = phases.shape
+    frames = len(ramp)
+
+    self._buffer('tables', tables.shape)[:num_oscilators, :tables.shape[1]] = tables
+
+    params = self._buffer('params', (2, num_oscilators))
+    params[0, :num_oscilators] = offset
+    params[1, :num_oscilators] = volume
+
+    self._buffer('phases', phases.shape)[:num_voices, :num_oscilators] = phases
+    self._buffer('increments', increments.shape)[:num_voices, :num_oscilators] = increments
+    if gains is not None:
+      self._buffer('gains', gains.shape)[:num_voices, :frames] = gains
+    else:
+      self._buffer('gains', (1, 1))
+    output = self._buffer('output', (self.num_workers, frames))
+
+    specs = {name: buffer.spec() for name, buffer in self.buffers.items()}
+    shards = min(self.num_workers, max(1, num_voices // self.min_voices_per_worker))
+    bounds = np.linspace(0, num_voices, shards + 1).astype(int)
+
+    for worker_idx in range(shards):
+      self.connections[worker_idx].send((specs, worker_idx, bounds[worker_idx], bounds[worker_idx + 1], frames, num_oscilators, tables.shape[1], gains is not None))
+
+    for worker_idx in range(shards):
+      self.connections[worker_idx].recv()
+
+    return output[:shards, :frames].sum(axis=0, out=out)
+
+  def close(self):
+    for connection in self.connections:
+      connection.send(None)
+    for process in self.processes:
+      process.join()
+    for buffer in self.buffers.values():
+      buffer.close()
+
+    self.connections, self.processes, self.buffers = [], [], {}
@@ -0,0 +1,49 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from synth.oscilator import default_oscilators
+from synth.sampler import Sampler
+
+class ParallelRendererTest(TestCase):
+  def _render(self, workers, blocks=3, **kwargs):
+    sampler = Sampler(num_voices=32, workers=workers, **kwargs)
+    oscilators = default_oscilators()
+
+    try:
+      for note in range(40, 72):
+        sampler.note_on(note, (oscilators, 440.0 * 2 ** ((note - 69) / 12)))
+      
+      master = np.concatenate([sampler.get_master().copy() for _ in range(blocks)]) # Preallocated blocks are reused
+      if workers:
+        self.assertIn('output', sampler.parallel.buffers)
+      return master
+    finally:
+      sampler.close()
+
+  def test_getMaster_ParallelShouldMatchSingleProcessRendering(self):
+    expected = self._render(workers=0)
+    actual = self._render(workers=3)
+
+    np.testing.assert_allclose(actual, expected, atol=1e-9)
+
+  def test_getMaster_PreallocatedShouldRenderOnTheWorkers(self):
+    expected = self._render(workers=0)
+    actual = self._render(workers=3, preallocate=True, dtype=np.float32)
+
+    self.assertEqual(actual.dtype, np.float32)
+    np.testing.assert_allclose(actual, expected, atol=1e-2)
+
+  def test_getMaster_FewVoicesShouldRenderInProcess(self):
+    sampler = Sampler(num_voices=4, workers=2)
+    oscilators = default_oscilators()
+
+    try:
+      sampler.note_on(69, (oscilators, 440.0))
+      self.assertFalse(sampler.parallel.accepts(1))
+      self.assertEqual(len(sampler.get_master()), 1024)
+    finally:
+      sampler.close()
+
+if __name__ == "__main__":
+  main()
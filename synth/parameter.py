@@ -10,18 +10,31 @@ class Parameter(object):
     self.min_value      = min_value
     self.label_format   = label_format
 
+    self.banks          = {} # ParameterBank -> index of this parameter in it, see ParameterBank.register
+    self.version        = 0  # Incremented on every change, to cache what is computed from it
+
   def get(self):
     """ Returns the absolute value of this parameter, based on the minimum and maximum values. """
     return self.relative_value * (self.max_value - self.min_value) + self.min_value
   
+  def get_snapshot(self):
+    """ Returns the absolute value as of the last snapshot of the (first) bank this parameter was registered in, or the current one if it has no bank. """
+    for bank, index in list(self.banks.items()):
+      return bank.values[index]
+
+    return self.get()
+
   def get_relative(self):
     return self.relative_value
 
   def set_relative(self, new_value):
     """ Sets the relative value [0,1] where 0 is minumum and 1 is maximum. """
-    if new_value < 0.0:
-      self.relative_value = 0.0
-    elif new_value > 1.0:
-      self.relative_value = 1.0
-    else:
-      self.relative_value = new_value
+    new_value = min(max(new_value, 0.0), 1.0)
+    if new_value == self.relative_value:
+      return
+
+    self.relative_value = new_value
+    self.version += 1
+
+    for bank, index in list(self.banks.items()): # A copy, as banks register parameters from the render thread
+      bank.write(index, self.relative_value)
@@ -0,0 +1,51 @@
+import threading
+import numpy as np
+
+class ParameterBank(object):
+  """ Keeps the values of many Parameters in contiguous arrays.
+
+  Parameters write their relative value through to the bank when set; snapshot() converts all of them to absolute values at once, under the same lock, so a renderer that snapshots once per block sees every write either entirely before or entirely after that block. """
+  def __init__(self, dtype=np.float64):
+    self.dtype      = dtype
+    self.parameters = []
+    self.relative   = np.zeros(0, dtype=dtype)
+    self.minimum    = np.zeros(0, dtype=dtype)
+    self.span       = np.zeros(0, dtype=dtype)
+    self.values     = np.zeros(0, dtype=dtype) # Absolute values as of the last snapshot
+
+    self._lock = threading.Lock()
+
+  def register(self, parameter):
+    """ Adds parameter to the bank, if it is not in it already. Returns its index. """
+    if self in parameter.banks:
+      return parameter.banks[self]
+
+    with self._lock:
+      index = len(self.parameters)
+      self.parameters.append(parameter)
+
+      self.relative = np.append(self.relative, parameter.relative_value).astype(self.dtype)
+      self.minimum  = np.append(self.minimum, parameter.min_value).astype(self.dtype)
+      self.span     = np.append(self.span, parameter.max_value - parameter.min_value).astype(self.dtype)
+      self.values   = np.append(self.values, parameter.get()).astype(self.dtype)
+
+      parameter.banks[self] = index
+
+    return index
+
+  def write(self, index, relative_value):
+    """ Called by Parameter.set_relative. """
+    with self._lock:
+      self.relative[index] = relative_value
+
+  def snapshot(self):
+    """ Updates and returns the absolute values of all parameters. """
+    with self._lock:
+      np.multiply(self.relative, self.span, out=self.values)
+    
+    self.values += self.minimum
+    return self.values
+
+  def indexes(self, parameters):
+    """ The indexes of parameters, registering them if needed, to gather their values from a snapshot. """
+    return np.array([self.register(parameter) for parameter in parameters], dtype=np.intp)
@@ -0,0 +1,48 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from synth.parameter import Parameter
+from synth.parameter_bank import ParameterBank
+
+class ParameterBankTest(TestCase):
+  def test_snapshot_ShouldHoldAbsoluteValues(self):
+    bank = ParameterBank()
+    parameters = [Parameter('a'), Parameter('b', min_value=-12, max_value=12, init_value=0.25)]
+    bank.indexes(parameters)
+
+    np.testing.assert_allclose(bank.snapshot(), [0.5, -6.0])
+
+  def test_register_TwiceShouldKeepIndex(self):
+    bank = ParameterBank()
+    parameter = Parameter('a')
+
+    self.assertEqual(bank.register(parameter), 0)
+    self.assertEqual(bank.register(parameter), 0)
+    self.assertEqual(len(bank.parameters), 1)
+
+  def test_setRelative_ShouldApplyOnNextSnapshot(self):
+    bank = ParameterBank()
+    parameter = Parameter('a', max_value=10)
+    bank.register(parameter)
+    bank.snapshot()
+
+    parameter.set_relative(0.1)
+    self.assertEqual(parameter.get_snapshot(), 5.0)
+
+    bank.snapshot()
+    self.assertAlmostEqual(parameter.get_snapshot(), 1.0)
+
+  def test_setRelative_ShouldWriteToEveryBank(self):
+    banks = [ParameterBank(), ParameterBank()]
+    parameter = Parameter('a')
+    for bank in banks:
+      bank.register(parameter)
+
+    parameter.set_relative(2.0)
+
+    for bank in banks:
+      self.assertEqual(bank.snapshot()[0], 1.0)
+
+if __name__ == '__main__':
+  main()
@@ -1,62 +1,159 @@
 #!/usr/bin/python
 
-import sounddevice as sd
+import threading
 import numpy
 
+from .backends import SoundDeviceBackend
+from .dynamics import (Limiter, CEILING)
+from .ring_buffer import RingBuffer
+
+MODE_BLOCKING = 'blocking'
+MODE_CALLBACK = 'callback'
+
+QUEUE_BLOCKS         = 2   # The ring is filled up to this many device blocks ahead of the callback, at least
+DEFAULT_DEVICE_BLOCK = 512 # Assumed until the callback asks for more, when blocksize is 0 (PortAudio picks it)
+
 class Player(object):
-  def __init__(self, channels=1, audio_format=numpy.float32, volume=0.5):
+  def __init__(self, channels=1, audio_format=numpy.float32, volume=0.5, mode=MODE_BLOCKING, blocksize=0, latency='low', buffer_size=8192, queue_size=0, sample_rate=44100, backend=None, ceiling=CEILING, soft_clip=False):
+    self.backend            = backend if backend is not None else SoundDeviceBackend()
     self.channels           = channels
     self.format             = audio_format
     self.volume             = volume
+    self.mode               = mode
+    self.blocksize          = blocksize
+    self.latency            = latency
+    self.sample_rate        = sample_rate
     
-    self.output_devices     = Player.read_devices()
-    self.selected_device_id = sd.default.device[1]
+    self.selected_device_id = self.backend.default_device()
+    self._output_devices    = None
 
     self.master_sample = None
+
+    self.output_underflows = 0 # Reported by PortAudio through the callback status flags
+    self.underruns         = 0 # The ring buffer ran dry while a note was playing
+    
+    if self.mode == MODE_CALLBACK:
+      self.queue_size    = queue_size                        # Samples to keep queued ahead of the callback, see queue_limit
+      self.device_frames = blocksize or DEFAULT_DEVICE_BLOCK # Largest block the callback was asked for
+      self.ring_buffer   = RingBuffer(buffer_size, dtype=self.format)
+      self._mono         = numpy.zeros(buffer_size, dtype=self.format)
+      self._space_event  = threading.Event()
+      self._streaming    = False
+
+    self.limiter = Limiter(sample_rate, ceiling, soft_clip=soft_clip, dtype=self.format)
+    
     self.stream = self.open_stream()
 
-  @classmethod
   def read_devices(self):
-    output_devices = {}
-    dev_list = sd.query_devices()
-    for i in range(len(dev_list)):
-      dev = dev_list[i]
-      if dev['max_output_channels'] > 0:
-        output_devices[i] = dev
-  
-    return output_devices
+    return self.backend.read_devices()
+
+  @property
+  def output_devices(self):
+    """ The output devices, queried on first use: listing them is slow and only the interface shows them. """
+    if self._output_devices is None:
+      self._output_devices = self.read_devices()
+
+    return self._output_devices
 
   def get_output_device(self):
     return self.output_devices[self.selected_device_id]
 
   def open_stream(self):
-    stream = sd.OutputStream(
-      channels= self.channels,
-      dtype= self.format,
+    stream = self.backend.open_stream(
+      channels=self.channels,
+      dtype=self.format,
       device=self.selected_device_id,
-      latency='low'
+      sample_rate=self.sample_rate,
+      blocksize=self.blocksize,
+      latency=self.latency,
+      callback=self._callback if self.mode == MODE_CALLBACK else None
     )
 
+    if self.mode == MODE_CALLBACK and not self.backend.clocked:
+      stream.pull_when(self._block_ready)
+
     stream.start()
 
     return stream
 
+  def _block_ready(self, frames):
+    """ Whether an unclocked stream can pull frames: a full block is queued, or what is left once the voices went silent. """
+    available = self.ring_buffer.available()
+    return available >= min(frames, self.queue_limit()) or (available > 0 and not self._streaming)
+
+  def _notify(self):
+    if not self.backend.clocked:
+      self.stream.notify()
+
+  def _callback(self, outdata, frames, time, status):
+    """ Called by PortAudio whenever it needs frames. Must not block nor allocate. """
+    if status.output_underflow:
+      self.output_underflows += 1
+    if frames > self.device_frames:
+      self.device_frames = frames
+
+    mono = self._mono[:frames] if frames <= len(self._mono) else numpy.zeros(frames, dtype=self.format)
+    read = self.ring_buffer.read_into(mono)
+    
+    if read < frames:
+      mono[read:] = 0.0
+      if self._streaming:
+        self.underruns += 1
+    
+    outdata[:] = mono[:, numpy.newaxis]
+    self._space_event.set()
+
   def play_sample(self, sample):
     self.master_sample = sample
     if sample is None or len(sample) == 0:
+      self.limiter.reset()
+      if self.mode == MODE_CALLBACK:
+        self._streaming = False
+        self._notify()
       return
     
     normalized = self.normalize(sample)
 
     self.master_sample = normalized
-    self.stream.write(normalized)
+    
+    if self.mode == MODE_CALLBACK:
+      self._streaming = True
+      self._write_ring(normalized)
+    else:
+      self.stream.write(normalized)
+
+  def queue_limit(self):
+    """ How many samples the ring is filled with at most: queue_size, but no less than QUEUE_BLOCKS of the blocks the device asks for, so the callback never waits on the writer. Everything queued adds latency. """
+    if self.mode != MODE_CALLBACK:
+      return 0
+
+    return min(max(self.queue_size, QUEUE_BLOCKS * self.device_frames), self.ring_buffer.capacity)
+
+  def queued(self):
+    """ Samples written but not pulled by the device yet. """
+    return self.ring_buffer.available() if self.mode == MODE_CALLBACK else 0
+
+  def delay(self, frames):
+    """ Samples until the start of the last frames played is pulled by the device: the samples queued before them, plus the limiter's lookahead. """
+    return max(self.queued() - frames, 0) + self.limiter.chunk
+
+  def _write_ring(self, sample, timeout=1.0):
+    """ Writes sample to the ring buffer, waiting for the callback to make room whenever queue_limit samples are queued. """
+    written = 0
+    while written < len(sample):
+      self._space_event.clear()
+      room = self.queue_limit() - self.ring_buffer.available()
+      count = self.ring_buffer.write(sample[written:written + room]) if room > 0 else 0
+      written += count
+      if count:
+        self._notify()
+      
+      if count == 0 and not self._space_event.wait(timeout):
+        return # The stream is not pulling, drop the rest
 
   def normalize(self, sample):
-    max_sample_value = numpy.max(sample)
-    ratio = self.volume / max_sample_value
-    norm = (ratio * sample).astype(self.format)
-    
-    return norm
+    """ Applies the volume and the master limiter. The result is delayed by the limiter's lookahead and only valid until the next call. """
+    return self.limiter.process(sample, self.volume)
 
   def set_volume(self, vol):
     self.volume = float(vol)
@@ -0,0 +1,48 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from synth.backends import NullBackend
+from synth.player import (Player, MODE_BLOCKING, MODE_CALLBACK)
+
+class PlayerTest(TestCase):
+  def test_player_ShouldQueryDevicesOnFirstUse(self):
+    class CountingBackend(NullBackend):
+      queries = 0
+      def read_devices(self):
+        CountingBackend.queries += 1
+        return super().read_devices()
+
+    player = Player(mode=MODE_BLOCKING, backend=CountingBackend(realtime=False))
+    try:
+      self.assertEqual(CountingBackend.queries, 0)
+      self.assertEqual(player.get_output_device()['name'], NullBackend.name)
+      player.get_output_device()
+      self.assertEqual(CountingBackend.queries, 1)
+    finally:
+      player.terminate()
+
+  def test_player_CallbackShouldOnlyQueueAFewDeviceBlocks(self):
+    player = Player(mode=MODE_CALLBACK, blocksize=256, backend=NullBackend(realtime=True))
+    queued = []
+    try:
+      for _ in range(40):
+        player.play_sample(np.ones(1024))
+        queued.append(player.queued())
+    finally:
+      player.terminate()
+
+    self.assertEqual(player.queue_limit(), 512)
+    self.assertLessEqual(max(queued), 512)
+
+  def test_player_DelayShouldCountTheQueuedSamples(self):
+    player = Player(mode=MODE_CALLBACK, backend=NullBackend(realtime=False))
+    player.terminate() # Nothing pulls from the ring anymore
+
+    player.ring_buffer.write(np.ones(600))
+
+    self.assertEqual(player.delay(200), 400 + player.limiter.chunk)
+    self.assertEqual(player.delay(1000), player.limiter.chunk)
+
+if __name__ == "__main__":
+  main()
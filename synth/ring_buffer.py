@@ -0,0 +1,44 @@
+import numpy as np
+
+class RingBuffer(object):
+  """ A preallocated single-producer/single-consumer ring of samples. One thread may write while another one reads; each side only moves its own index. """
+  def __init__(self, capacity, dtype=np.float32):
+    self.capacity = capacity
+    self.buffer = np.zeros(capacity + 1, dtype=dtype) # One slot is kept free to tell full from empty
+
+    self.read_index = 0
+    self.write_index = 0
+
+  def available(self):
+    """ Number of samples ready to be read. """
+    return (self.write_index - self.read_index) % len(self.buffer)
+
+  def space(self):
+    """ Number of samples that can be written without overwriting unread ones. """
+    return self.capacity - self.available()
+
+  def write(self, data):
+    """ Copies as much of data as fits into the ring. Returns the number of samples written. """
+    size = len(self.buffer)
+    count = min(len(data), self.space())
+    start = self.write_index
+    first = min(count, size - start)
+
+    self.buffer[start:start + first] = data[:first]
+    self.buffer[:count - first] = data[first:count]
+
+    self.write_index = (start + count) % size
+    return count
+
+  def read_into(self, out):
+    """ Moves up to len(out) samples into out. Returns the number of samples read; the rest of out is left untouched. """
+    size = len(self.buffer)
+    count = min(len(out), self.available())
+    start = self.read_index
+    first = min(count, size - start)
+
+    out[:first] = self.buffer[start:start + first]
+    out[first:count] = self.buffer[:count - first]
+
+    self.read_index = (start + count) % size
+    return count
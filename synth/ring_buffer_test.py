@@ -0,0 +1,41 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from synth.ring_buffer import RingBuffer
+
+class RingBufferTest(TestCase):
+  def test_write_ShouldNotWriteMoreThanCapacity(self):
+    ring = RingBuffer(4)
+
+    written = ring.write(np.arange(6))
+
+    self.assertEqual(written, 4)
+    self.assertEqual(ring.available(), 4)
+    self.assertEqual(ring.space(), 0)
+
+  def test_readInto_ShouldReturnSamplesInOrderAcrossTheWrap(self):
+    ring = RingBuffer(4)
+    out = np.zeros(3, dtype=np.float32)
+
+    ring.write(np.array([1, 2, 3]))
+    ring.read_into(out)
+    ring.write(np.array([4, 5, 6]))
+    read = ring.read_into(out)
+
+    self.assertEqual(read, 3)
+    np.testing.assert_array_equal(out, [4, 5, 6])
+
+  def test_readInto_ShouldOnlyFillAvailableSamples(self):
+    ring = RingBuffer(4)
+    out = np.full(4, -1.0, dtype=np.float32)
+
+    ring.write(np.array([1, 2]))
+    read = ring.read_into(out)
+
+    self.assertEqual(read, 2)
+    np.testing.assert_array_equal(out, [1, 2, -1, -1])
+    self.assertEqual(ring.available(), 0)
+
+if __name__ == "__main__":
+  main()
@@ -1,66 +1,347 @@
+import itertools
+import math
 import numpy as np
 import logging
 
+from .buffers import (BufferPool, ufunc_buffers)
+from .envelope import EnvelopeBank
+from .parameter_bank import ParameterBank
+from .voice_manager import (VoiceManager, STEAL_OLDEST)
+from .waveform import (interpolate_stack, interpolate_stack_into)
+
 LOGGER_NAME = 'Sampler'
 
+def mix_voices(waves, volume, gains=None):
+  """ Sums waves (voices x oscilators x samples) into one block, scaling each oscilator by its volume and each voice by its per sample gains (voices x samples), if given. """
+  if gains is None:
+    return np.einsum('vos,o->s', waves, volume)
+
+  return np.einsum('vos,o,vs->s', waves, volume, gains)
+
+def render_wavetables(tables, offset, volume, phases, increments, ramp, gains=None):
+  """ Renders and mixes voices that read a stack of wavetables (oscilators x table size), one per oscilator. phases and increments (voices x oscilators, in cycles) are where each voice starts and how much it advances per sample; offset is each oscilator's phase parameter, in cycles. """
+  cycles = (phases + offset)[:, :, np.newaxis] + increments[:, :, np.newaxis] * ramp
+  
+  return mix_voices(interpolate_stack(tables, cycles), volume, gains)
+
+def render_wavetables_into(out, buffers, tables, offset, volume, phases, increments, ramp, gains=None):
+  """ render_wavetables without allocating: the block is written to out and the work arrays are taken from buffers, a BufferPool. """
+  shape = phases.shape + (len(ramp),)
+  cycles = buffers.get('cycles', shape)
+  np.multiply(increments[:, :, np.newaxis], ramp, out=cycles)
+  start = np.add(phases, offset, out=buffers.get('start', phases.shape))
+  cycles += start[:, :, np.newaxis]
+
+  waves = interpolate_stack_into(tables, cycles, buffers.get('waves', shape), buffers.get('index', shape, np.intp), buffers.get('fraction', shape))
+  if gains is None:
+    return np.einsum('vos,o->s', waves, volume, out=out)
+
+  return np.einsum('vos,o,vs->s', waves, volume, gains, out=out)
+
 class Sampler(object):
-  def __init__(self, sample_rate=44100, sample_size=1024, num_voices=8, log=None):
+  """ Renders the active voices block by block.
+
+  With preallocate, blocks are rendered into work buffers that are reused from block to block (see buffers), so the render loop does not allocate sample arrays. Phases, frequencies, envelopes and parameter snapshots are all kept in dtype, as mixing types would make NumPy allocate casting buffers. """
+  def __init__(self, sample_rate=44100, sample_size=1024, num_voices=8, batched=True, steal_policy=STEAL_OLDEST, envelopes=True, workers=0, preallocate=False, dtype=np.float64, log=None):
     self.log = log.getChild(LOGGER_NAME) if log else logging.getLogger(LOGGER_NAME)
     
     self.num_voices = num_voices
     self.sample_size = sample_size
     self.sample_rate = sample_rate
+    self.batched = batched
+    self.dtype = dtype
+    self.buffers = BufferPool(dtype) if preallocate else None
     self.voices = [None] * num_voices
+    self.voice_manager = VoiceManager(num_voices, steal_policy)
+    self.envelopes = EnvelopeBank(num_voices, sample_rate, dtype=dtype) if envelopes else None
+    self.parameters = ParameterBank(dtype) # Snapshotted once per block, renderers read their values from it
+    self._parameter_indexes = {} # id(oscilators) -> (oscilators, detune, phase and volume indexes in parameters)
+    self.freqs = np.zeros(num_voices, dtype=dtype)
+    self.phases = np.zeros((num_voices, 0), dtype=dtype) # Per voice, per oscilator phase, in cycles
+    self._banks = {} # id(oscilators) -> [oscilators, number of voices playing them]
+    self._ramp = np.arange(0, dtype=dtype)
+    self._elapsed = np.arange(1, 1, dtype=dtype)
+    self._tables = ([], None) # The last stacked wavetables and their stack, for preallocate
+    self.parallel = None
 
-  def _get_first_avilable_voice(self):
-    for i in range(self.num_voices):
-      if self.voices[i] is None:
-        return i
-    
-    return -1
+    if self.envelopes:
+      self.parameters.indexes(self.envelopes.parameters.values())
+
+    if workers > 0:
+      from .parallel import ParallelRenderer
+      self.parallel = ParallelRenderer(workers, log=self.log)
+
+  def close(self):
+    """ Stops the render worker processes, if any. """
+    if self.parallel:
+      self.parallel.close()
+      self.parallel = None
+
+  @property
+  def buffer_allocations(self):
+    """ Number of times a work buffer had to be allocated so far, in preallocate mode. Only counts the buffer pool, not every array NumPy allocates. """
+    return self.buffers.allocations if self.buffers else 0
+
+  def has_voices(self):
+    return self.voice_manager.num_active > 0
+
+  def allocate_voice(self, payload, note=None, level=1.0):
+    """ Starts playing payload, an (oscilators, freq) tuple, on a free voice, stealing one if needed. Returns the voice index. """
+    voice_idx, stolen_note = self.voice_manager.allocate(note, level)
+    if self.voices[voice_idx] is not None:
+      self.log.debug(f'Stealing voice {voice_idx} (note {stolen_note})')
+      self._forget_bank(voice_idx)
+      if self.envelopes and stolen_note != note:
+        self.envelopes.reset(voice_idx)
 
-  def allocate_voice(self, payload):
-    voice_idx = self._get_first_avilable_voice()
+    oscilators, freq = payload
     self.voices[voice_idx] = payload
+    self.freqs[voice_idx] = freq
+    self._banks.setdefault(id(oscilators), [oscilators, 0])[1] += 1
+
+    if len(oscilators) > self.phases.shape[1]:
+      phases = np.zeros((self.num_voices, len(oscilators)), dtype=self.dtype)
+      phases[:, :self.phases.shape[1]] = self.phases
+      self.phases = phases
+    self.phases[voice_idx] = 0.0
+    if self.envelopes:
+      self.envelopes.trigger(voice_idx)
     
     self.log.debug(f'Allocating voice {voice_idx} with {payload}')
     return voice_idx
   
   def free_voice(self, voice_idx):
     self.log.debug(f'Freeing voice {voice_idx}')
+    self.voice_manager.release(voice_idx)
+    self._forget_bank(voice_idx)
     self.voices[voice_idx] = None
     self.log.debug(f'Voice Status: {self.voices}')
 
-  def sample_waves(self, payload, duration, start_time=0.0):
+  def _forget_bank(self, voice_idx):
+    if self.voices[voice_idx] is None:
+      return
+
+    bank_id = id(self.voices[voice_idx][0])
+    self._banks[bank_id][1] -= 1
+    if self._banks[bank_id][1] == 0:
+      del self._banks[bank_id]
+
+  def note_on(self, note, payload, level=1.0):
+    return self.allocate_voice(payload, note, level)
+
+  def note_off(self, note):
+    """ Releases the (oldest) voice playing note. With envelopes, the voice keeps playing its release and is freed once it is silent. Returns its index, or None if the note was not playing. """
+    voice_idx = self.voice_manager.voice_of(note)
+    if voice_idx is None:
+      return None
+
+    if self.envelopes:
+      self.voice_manager.detach(voice_idx)
+      self.envelopes.release_voice(voice_idx)
+    else:
+      self.free_voice(voice_idx)
+
+    return voice_idx
+
+  def _get_ramp(self, frames):
+    """ Returns [0, 1, ..., frames - 1], the per sample phase multiplier. """
+    if len(self._ramp) < frames:
+      self._ramp = np.arange(frames, dtype=self.dtype)
+      self._elapsed = self._ramp + 1
+    
+    return self._ramp[:frames]
+
+  def _get_elapsed(self, frames):
+    """ Returns [1, 2, ..., frames], the envelope time of each sample. """
+    self._get_ramp(frames)
+    return self._elapsed[:frames]
+
+  def sample_waves(self, voice_idx, frames=None):
     samples = []
-    oscilators, freq = payload
+    oscilators, freq = self.voices[voice_idx]
+    frames = self.sample_size if frames is None else frames
+    ramp = self._get_ramp(frames)
+    detune, offset, volume = self.oscilator_values(oscilators)
     
-    for osc in oscilators:
-      t = np.arange(start_time, start_time + duration, 1/self.sample_rate)
-      sample = osc.evaluate(t, freq)
-      samples.append(sample)
+    for i, osc in enumerate(oscilators):
+      increment = (freq + detune[i]) / self.sample_rate
+      cycles = self.phases[voice_idx, i] + offset[i] + increment * ramp
+      if osc.wavetable:
+        sample = osc.waveform.lookup(cycles)
+      else:
+        sample = osc.waveform(2 * math.pi * cycles)
+      samples.append(volume[i] * sample)
+
+      self.phases[voice_idx, i] = (self.phases[voice_idx, i] + increment * frames) % 1.0
     
-    return self.mix(samples)
+    return self.mix(samples, frames)
+
+  def oscilator_values(self, oscilators):
+    """ Returns the detune, phase offset (in cycles) and volume arrays of oscilators, as of the last parameter snapshot. """
+    key = id(oscilators)
+    if key not in self._parameter_indexes:
+      indexes = self.parameters.indexes([parameter for osc in oscilators for parameter in (osc.detune, osc.phase, osc.volume)])
+      self.parameters.indexes([parameter for osc in oscilators for parameter in osc.waveform.shape_parameters()]) # Read by WaveForm.table
+      self._parameter_indexes[key] = (oscilators, indexes.reshape(-1, 3).T)
 
-  def get_master(self, duration, start_time=0.0):
-    samples = [self.sample_waves(o, duration, start_time) for o in self.voices if o is not None]
+    indexes = self._parameter_indexes[key][1]
+    if self.buffers:
+      values = np.take(self.parameters.values, indexes, out=self.buffers.get('oscilator_values', indexes.shape), mode='clip')
+      values[1] /= 2 * math.pi
+      return values
+
+    detune, phase, volume = self.parameters.values[indexes]
+    return detune, phase / (2 * math.pi), volume
+
+  def snapshot_parameters(self):
+    """ Takes the parameter values used to render the next block. Parameters changed after this are not heard until the next snapshot. """
+    for oscilators, _ in self._banks.values():
+      self.oscilator_values(oscilators) # Registers new banks before the snapshot
+    self.parameters.snapshot()
+
+  def get_master(self, frames=None):
+    """ Renders the next block of all active voices, advancing their phases and envelopes. The block has sample_size samples unless frames is given. Voices whose release ended are freed. """
+    self.snapshot_parameters()
+    return self._render(self.sample_size if frames is None else frames)
+
+  def _render(self, frames):
+    if self.buffers:
+      with ufunc_buffers():
+        return self._render_active(frames)
+
+    return self._render_active(frames)
+
+  def _render_active(self, frames):
+    active = self.voice_manager.get_active().copy()
+    if len(active) == 0:
+      return []
+
+    gains, finished = None, []
+    if self.envelopes:
+      gains, finished = self.envelopes.advance(active, frames, self._get_elapsed(frames), self.buffers)
+      self.voice_manager.levels[active] = self.envelopes.level[active]
+
+    if self.batched:
+      final = self.get_master_batched(active, gains, frames)
+    else:
+      samples = [self.sample_waves(voice_idx, frames) for voice_idx in active]
+      if gains is not None:
+        samples = [sample * voice_gains for sample, voice_gains in zip(samples, gains)]
+      final = self.mix(samples, frames)
+
+    for voice_idx in finished:
+      self.free_voice(voice_idx)
     
-    return self.mix(samples)
+    return final
+
+  def get_master_split(self, frames, events, dispatch):
+    """ Renders the next frames samples, calling dispatch(item) for each (offset, item) in events (sorted by offset) right before rendering that sample, so they take effect on it exactly. """
+    final = []
+    position = 0
+    self.snapshot_parameters()
+
+    for offset, item in itertools.chain(events, ((frames, None),)):
+      if offset > position:
+        block = self._render(offset - position)
+        if len(block) > 0:
+          if len(final) == 0:
+            final = self.buffers.zeros('split', frames) if self.buffers else np.zeros(frames)
+          final[position:offset] = block
+        position = offset
+
+      if item is not None:
+        dispatch(item)
+
+    return final
+
+  def _group_by_bank(self, active):
+    """ Returns (oscilators, rows) pairs, where rows are the positions in active of the voices playing those oscilators. Voices usually all play the same bank, which needs no grouping. """
+    if len(self._banks) == 1:
+      oscilators, _ = next(iter(self._banks.values()))
+      return [(oscilators, slice(None))]
+
+    groups = {}
+    for row, voice_idx in enumerate(active):
+      oscilators, _ = self.voices[voice_idx]
+      groups.setdefault(id(oscilators), (oscilators, []))[1].append(row)
+
+    return [(oscilators, np.array(rows)) for oscilators, rows in groups.values()]
+
+  def get_master_batched(self, active, gains, frames):
+    """ Renders one block of the active voices at once, as a (voices x oscilators x samples) array. Voices are grouped by the oscilator bank they play. gains, if given, holds the per sample gain of each active voice. """
+    final = self.buffers.zeros('master', frames) if self.buffers else np.zeros(frames)
+    for oscilators, rows in self._group_by_bank(active):
+      voice_indexes = active[rows]
+      num_oscilators = len(oscilators)
+      voice_gains = gains[rows] if gains is not None else None
+
+      out = self.buffers.get('bank', frames) if self.buffers else None
+
+      block, phases = self.render_bank(oscilators, self.freqs[voice_indexes], self.phases[voice_indexes, :num_oscilators], frames, voice_gains, out)
+      self.phases[voice_indexes, :num_oscilators] = phases
+      final += block
+
+    return final
+
+  def render_bank(self, oscilators, freqs, phases, frames, gains=None, out=None):
+    """ Renders the sum of all oscilators for every frequency in freqs, starting at phases (voices x oscilators, in cycles) and scaled by gains (voices x samples), if given. Returns the block and the phases for the next block. In preallocate mode, wavetable banks are rendered into out. """
+    detune, offset, volume = self.oscilator_values(oscilators)
+    ramp = self._get_ramp(frames)
+
+    if self.buffers:
+      increments = self.buffers.get('increments', phases.shape)
+      np.add(freqs[:, np.newaxis], detune, out=increments)
+      increments /= self.sample_rate
+      next_phases = self.buffers.get('next_phases', phases.shape)
+      np.multiply(increments, frames, out=next_phases)
+      next_phases += phases
+      np.mod(next_phases, 1.0, out=next_phases)
+    else:
+      increments = (freqs[:, np.newaxis] + detune) / self.sample_rate
+      next_phases = (phases + increments * frames) % 1.0
+
+    tables = [osc.waveform.table() for osc in oscilators if osc.wavetable]
+    if len(tables) == len(oscilators) and len({len(table) for table in tables}) == 1:
+      tables = self._stack_tables(tables)
+      if self.parallel and self.parallel.accepts(len(freqs)):
+        return self.parallel.render(tables, offset, volume, phases, increments, ramp, gains, out=out), next_phases
+
+      if out is not None and self.buffers:
+        return render_wavetables_into(out, self.buffers, tables, offset, volume, phases, increments, ramp, gains), next_phases
+
+      return render_wavetables(tables, offset, volume, phases, increments, ramp, gains), next_phases
+
+    cycles = (phases + offset)[:, :, np.newaxis] + increments[:, :, np.newaxis] * ramp
+    waves = np.empty(cycles.shape)
+    for i, osc in enumerate(oscilators):
+      if osc.wavetable:
+        waves[:, i] = osc.waveform.lookup(cycles[:, i])
+      else:
+        waves[:, i] = osc.waveform(2 * math.pi * cycles[:, i])
+
+    return mix_voices(waves, volume, gains), next_phases
+
+  def _stack_tables(self, tables):
+    """ Stacks tables into one (oscilators x table size) array. In preallocate mode the stack is kept, in dtype, until one of the tables changes. """
+    if not self.buffers:
+      return np.stack(tables)
+
+    stacked, stack = self._tables
+    if len(stacked) != len(tables) or any(table is not previous for table, previous in zip(tables, stacked)):
+      self._tables = (tables, np.stack(tables).astype(self.dtype))
+
+    return self._tables[1]
 
-  def mix(self, samples):
+  def mix(self, samples, frames=None):
       if not samples:
         return []
 
       self.log.debug(f'Voice Status: {self.voices}')
       self.log.debug(f'Mixing {len(samples)} samples')
 
-      final = np.zeros(self.sample_size)
+      final = np.zeros(self.sample_size if frames is None else frames)
       
       for sample in samples:
-        work_sample = sample
-        if len(sample) > self.sample_size:
-          work_sample = sample[0:self.sample_size] # Hard cut
-        
-        final = final + work_sample
+        final += sample
 
-      return final
\ No newline at end of file
+      return final
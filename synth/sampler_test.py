@@ -0,0 +1,139 @@
+from unittest import TestCase, main
+
+import tracemalloc
+import numpy as np
+
+from synth.oscilator import Oscilator
+from synth.sampler import Sampler
+from synth.waveform import WAVEFORMS
+
+FREQS = (220.0, 440.0, 659.25)
+
+def create_oscilators(wavetable=True):
+  return [Oscilator(waveform, name=name, wavetable=wavetable) for name, waveform in WAVEFORMS.items()]
+
+class SamplerTest(TestCase):
+  def _create_sampler(self, batched, wavetable, freqs=FREQS):
+    sampler = Sampler(batched=batched)
+    oscilators = create_oscilators(wavetable)
+    for freq in freqs:
+      sampler.allocate_voice((oscilators, freq))
+
+    return sampler
+
+  def test_getMaster_NoVoicesShouldReturnEmpty(self):
+    self.assertEqual(len(Sampler().get_master()), 0)
+
+  def test_getMaster_BatchedShouldMatchPerVoiceRendering(self):
+    expected = self._create_sampler(batched=False, wavetable=True).get_master()
+    actual = self._create_sampler(batched=True, wavetable=True).get_master()
+
+    self.assertEqual(len(actual), 1024)
+    np.testing.assert_allclose(actual, expected, atol=1e-9)
+
+  def test_getMaster_BatchedWithoutWavetablesShouldMatchPerVoiceRendering(self):
+    expected = self._create_sampler(batched=False, wavetable=False).get_master()
+    actual = self._create_sampler(batched=True, wavetable=False).get_master()
+
+    np.testing.assert_allclose(actual, expected, atol=1e-9)
+
+  def test_getMaster_ConsecutiveBlocksShouldBeContinuous(self):
+    for batched in (True, False):
+      sampler = Sampler(batched=batched, envelopes=False)
+      oscilators, freq = [Oscilator(WAVEFORMS['SINE'])], 440.0
+      sampler.allocate_voice((oscilators, freq))
+      t = np.arange(3 * sampler.sample_size) / sampler.sample_rate
+      expected = sum(osc.evaluate(t, freq) for osc in oscilators)
+
+      actual = np.concatenate([sampler.get_master() for _ in range(3)])
+
+      np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+  def test_getMaster_PhasesShouldWrap(self):
+    sampler = self._create_sampler(batched=True, wavetable=True)
+
+    for _ in range(100):
+      sampler.get_master()
+
+    self.assertTrue(np.all(sampler.phases >= 0.0))
+    self.assertTrue(np.all(sampler.phases < 1.0))
+
+  def test_allocateVoice_ShouldResetPhases(self):
+    sampler = self._create_sampler(batched=True, wavetable=True, freqs=(440.0,))
+    sampler.get_master()
+    payload = sampler.voices[0]
+
+    sampler.free_voice(0)
+    sampler.allocate_voice(payload)
+
+    np.testing.assert_array_equal(sampler.phases[0], 0.0)
+
+  def test_noteOn_FullShouldStealTheOldestVoice(self):
+    sampler = Sampler(num_voices=2)
+    oscilators = create_oscilators()
+
+    first = sampler.note_on(60, (oscilators, 261.6))
+    sampler.note_on(62, (oscilators, 293.7))
+    stolen = sampler.note_on(64, (oscilators, 329.6))
+
+    self.assertEqual(stolen, first)
+    self.assertEqual(sampler.freqs[stolen], 329.6)
+    self.assertIsNone(sampler.note_off(60))
+    self.assertEqual(sampler.note_off(64), stolen)
+    self.assertEqual(len(sampler.get_master()), 1024)
+
+  def test_getMasterSplit_ShouldDispatchEventsOnTheirSample(self):
+    sampler = Sampler()
+    oscilators = [Oscilator(WAVEFORMS['SINE'])]
+    dispatch = lambda freq: sampler.allocate_voice((oscilators, freq)) if freq else sampler.free_voice(0)
+
+    master = sampler.get_master_split(1024, [(100, 440.0), (600, 0)], dispatch)
+
+    self.assertFalse(np.any(master[:100]))
+    self.assertTrue(np.all(master[101:600] != 0))
+    self.assertFalse(np.any(master[600:]))
+
+  def test_getMaster_PreallocatedShouldMatchDefaultRendering(self):
+    expected = self._create_sampler(batched=True, wavetable=True)
+    actual = Sampler(preallocate=True, dtype=np.float32)
+    oscilators = create_oscilators(True)
+    for freq in FREQS:
+      actual.allocate_voice((oscilators, freq))
+
+    for _ in range(3):
+      block = actual.get_master()
+      self.assertEqual(block.dtype, np.float32)
+      np.testing.assert_allclose(block, expected.get_master(), atol=1e-2)
+
+  def test_getMaster_PreallocatedShouldNotAllocateBlocks(self):
+    oscilators = create_oscilators(True)
+    peaks = []
+    for frames in (128, 4096):
+      sampler = Sampler(sample_size=frames, preallocate=True, dtype=np.float32)
+      for freq in FREQS:
+        sampler.allocate_voice((oscilators, freq))
+      sampler.get_master()
+
+      tracemalloc.start()
+      try:
+        sampler.get_master()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+      finally:
+        tracemalloc.stop()
+
+    # One float32 block of 4096 samples takes 16KB, what is left are small per voice arrays and Python objects
+    self.assertLess(max(peaks), 12 * 1024)
+    self.assertLess(peaks[1] - peaks[0], 2 * 1024)
+
+  def test_getMasterSplit_ParameterChangesShouldWaitForNextBlock(self):
+    sampler = Sampler(envelopes=False)
+    oscilators = [Oscilator(WAVEFORMS['SINE'])]
+    sampler.allocate_voice((oscilators, 440.0))
+
+    master = sampler.get_master_split(1024, [(512, 0.0)], oscilators[0].volume.set_relative)
+    self.assertTrue(np.any(master[512:]))
+
+    self.assertFalse(np.any(sampler.get_master()))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,46 @@
+import heapq
+import itertools
+from collections import deque
+
+class EventScheduler(object):
+  """ Converts event timestamps to sample offsets inside render blocks.
+
+  Any thread may schedule() events; the render thread collects the ones that fall inside each block before rendering it. An event with timestamp ts lands at offset (ts - block_time) * sample_rate + delay of the block that starts at block_time, so events keep their relative timing as long as blocks are rendered at the pace they are played. The delay (in samples) is usually one block, which makes events that arrived while the previous block was playing land inside the next one. Events without a timestamp are applied at the start of the next block. """
+  def __init__(self, sample_rate=44100, delay=0):
+    self.sample_rate = sample_rate
+    self.delay       = delay
+
+    self.inbox    = deque() # Appended by any thread, drained by the render thread
+    self.pending  = []      # Heap of (timestamp, sequence, item), only touched by the render thread
+    self._sequence = itertools.count()
+
+  def schedule(self, item, timestamp=None):
+    self.inbox.append((timestamp, item))
+
+  def has_events(self):
+    return len(self.inbox) > 0 or len(self.pending) > 0
+
+  def _offset(self, timestamp, block_time):
+    if timestamp is None:
+      return 0
+
+    return max(0, int(round((timestamp - block_time) * self.sample_rate)) + self.delay)
+
+  def collect(self, block_time, frames):
+    """ Returns the (offset, item) pairs, sorted by offset, of the events that fall inside the block of frames samples starting at block_time. Late events are applied at offset 0. """
+    while self.inbox:
+      timestamp, item = self.inbox.popleft()
+      key = float('-inf') if timestamp is None else timestamp
+      heapq.heappush(self.pending, (key, next(self._sequence), timestamp, item))
+
+    events = []
+    while self.pending:
+      _, _, timestamp, item = self.pending[0]
+      offset = self._offset(timestamp, block_time)
+      if offset >= frames:
+        break
+
+      heapq.heappop(self.pending)
+      events.append((offset, item))
+
+    return events
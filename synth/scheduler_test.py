@@ -0,0 +1,38 @@
+from unittest import TestCase, main
+
+from synth.scheduler import EventScheduler
+
+class EventSchedulerTest(TestCase):
+  def test_collect_ShouldConvertTimestampsToOffsets(self):
+    scheduler = EventScheduler(sample_rate=1000)
+    scheduler.schedule('b', 10.5)
+    scheduler.schedule('a', 10.25)
+
+    events = scheduler.collect(10.0, 1000)
+
+    self.assertEqual(events, [(250, 'a'), (500, 'b')])
+
+  def test_collect_ShouldKeepEventsOfLaterBlocks(self):
+    scheduler = EventScheduler(sample_rate=1000)
+    scheduler.schedule('later', 11.5)
+
+    self.assertEqual(scheduler.collect(10.0, 1000), [])
+    self.assertTrue(scheduler.has_events())
+    self.assertEqual(scheduler.collect(11.0, 1000), [(500, 'later')])
+    self.assertFalse(scheduler.has_events())
+
+  def test_collect_LateAndUntimedEventsShouldStartTheBlock(self):
+    scheduler = EventScheduler(sample_rate=1000)
+    scheduler.schedule('late', 9.0)
+    scheduler.schedule('now')
+
+    self.assertEqual(scheduler.collect(10.0, 1000), [(0, 'now'), (0, 'late')])
+
+  def test_collect_ShouldApplyTheDelay(self):
+    scheduler = EventScheduler(sample_rate=1000, delay=100)
+    scheduler.schedule('a', 9.95)
+
+    self.assertEqual(scheduler.collect(10.0, 100), [(50, 'a')])
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,66 @@
+import numpy as np
+
+LOAD_BINS = np.array([0.0, 0.25, 0.5, 0.75, 0.9, 1.0, np.inf]) # Render time / deadline
+
+class EngineStats(object):
+  """ Real-time instrumentation of the render loop. Per block render times, DSP load, output queue depth and work buffer allocations are kept in rolling windows of the last history blocks. """
+  def __init__(self, history=512):
+    self.history = history
+    
+    self.render_times       = np.zeros(history)
+    self.loads              = np.zeros(history)
+    self.queue_depths       = np.zeros(history, dtype=int)
+    self.buffer_allocations = np.zeros(history, dtype=int)
+
+    self.blocks          = 0
+    self.deadline_misses = 0
+    self.errors          = 0
+
+  def record_block(self, render_time, deadline, queue_depth, buffer_allocations=0):
+    """ Records one rendered block: how long it took, how long it could have taken, how many blocks were queued for output and how many work buffers the render had to allocate (see BufferPool.allocations; other arrays NumPy allocates are not counted). """
+    index = self.blocks % self.history
+    load = render_time / deadline
+
+    self.render_times[index]       = render_time
+    self.loads[index]              = load
+    self.queue_depths[index]       = queue_depth
+    self.buffer_allocations[index] = buffer_allocations
+
+    if load > 1.0:
+      self.deadline_misses += 1
+    
+    self.blocks += 1
+
+  def record_error(self):
+    self.errors += 1
+
+  def _window(self, values):
+    return values[:min(self.blocks, self.history)]
+
+  def load_histogram(self):
+    """ Counts of the blocks in the window per DSP load bin (see LOAD_BINS). """
+    counts, _ = np.histogram(self._window(self.loads), LOAD_BINS)
+    return counts
+
+  def snapshot(self, player=None):
+    """ Returns the current numbers as a dict. Output underflows are read from player, when given. """
+    render_times = self._window(self.render_times)
+    loads = self._window(self.loads)
+    has_blocks = len(render_times) > 0
+
+    return {
+      'blocks': self.blocks,
+      'deadline_misses': self.deadline_misses,
+      'errors': self.errors,
+      'render_time_p50_ms': np.percentile(render_times, 50) * 1000 if has_blocks else 0.0,
+      'render_time_p99_ms': np.percentile(render_times, 99) * 1000 if has_blocks else 0.0,
+      'render_time_max_ms': render_times.max() * 1000 if has_blocks else 0.0,
+      'dsp_load': loads.mean() * 100 if has_blocks else 0.0,
+      'dsp_load_peak': loads.max() * 100 if has_blocks else 0.0,
+      'queue_depth': int(self.queue_depths[(self.blocks - 1) % self.history]) if has_blocks else 0,
+      'load_histogram': self.load_histogram().tolist(),
+      'buffer_allocations': int(self._window(self.buffer_allocations).sum()),
+      'buffer_allocations_last_block': int(self.buffer_allocations[(self.blocks - 1) % self.history]) if has_blocks else 0,
+      'output_underflows': player.output_underflows if player else 0,
+      'underruns': player.underruns if player else 0,
+    }
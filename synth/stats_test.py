@@ -0,0 +1,37 @@
+from unittest import TestCase, main
+
+from synth.stats import EngineStats
+
+class EngineStatsTest(TestCase):
+  def test_snapshot_NoBlocksShouldReportZeros(self):
+    stats = EngineStats().snapshot()
+
+    self.assertEqual(stats['blocks'], 0)
+    self.assertEqual(stats['dsp_load'], 0.0)
+    self.assertEqual(stats['render_time_p99_ms'], 0.0)
+
+  def test_recordBlock_ShouldCountDeadlineMisses(self):
+    stats = EngineStats()
+
+    stats.record_block(0.010, 0.020, 1)
+    stats.record_block(0.030, 0.020, 0)
+
+    snapshot = stats.snapshot()
+    self.assertEqual(snapshot['blocks'], 2)
+    self.assertEqual(snapshot['deadline_misses'], 1)
+    self.assertAlmostEqual(snapshot['dsp_load'], 100.0)
+    self.assertAlmostEqual(snapshot['dsp_load_peak'], 150.0)
+    self.assertEqual(snapshot['queue_depth'], 0)
+
+  def test_loadHistogram_ShouldOnlyCountTheRollingWindow(self):
+    stats = EngineStats(history=4)
+
+    for _ in range(10):
+      stats.record_block(0.030, 0.020, 0)
+    for _ in range(2):
+      stats.record_block(0.001, 0.020, 0)
+
+    self.assertEqual(stats.load_histogram().tolist(), [2, 0, 0, 0, 0, 2])
+
+if __name__ == "__main__":
+  main()
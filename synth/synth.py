@@ -1,48 +1,78 @@
 import threading
-import copy
 from .event_queue import (EventQueue, Event)
 import midi
 import time
 import numpy as np
-from scipy.signal import sawtooth
 import logging
 
-from .oscilator import Oscilator
-from .player import Player
+from .oscilator import default_oscilators
+from .block_ring import BlockRing
+from .player import (Player, MODE_CALLBACK)
 from .sampler import Sampler
-from .waveform import WAVEFORMS
+from .voice_manager import STEAL_OLDEST
+from .scheduler import EventScheduler
+from .stats import EngineStats
+from .tuner import BlockTuner
+from .tracer import LatencyTracer
 
 LOGGER_NAME = 'Synth'
 
-TERMINATE_EVT = Event(midi.EVT_MIDI, midi.SYSCOM_EXIT)
+EVT_SYS   = 'sys_'
+EXIT_ITEM = 'exit'
+
+# Not a midi message, so nothing coming from a midi stream can stop the synth
+TERMINATE_EVT = Event(EXIT_ITEM, EVT_SYS)
 
 class Synth(object):
-  def __init__(self, log=None):
+  def __init__(self, log=None, output_mode=MODE_CALLBACK, output_depth=2, backend=None, num_voices=8, steal_policy=STEAL_OLDEST, render_workers=0, preallocate=False, adaptive=False, block_sizes=(128, 4096), output_depths=(2, 8), trace=False):
     self.log = log.getChild(LOGGER_NAME) if log else logging.getLogger(LOGGER_NAME)
 
-    self.sampling_lock = threading.Condition()
+    self.sampling_lock  = threading.Condition()
+    self.output_mode    = output_mode
+    self.output_depth   = output_depth
+    self.backend        = backend
+    self.num_voices     = num_voices
+    self.steal_policy   = steal_policy
+    self.render_workers = render_workers
+    self.preallocate    = preallocate # Render in float32 into buffers reused from block to block
+    self.adaptive       = adaptive    # Tune the block size and output depth, within these bounds, from the DSP load
+    self.block_sizes    = block_sizes
+    self.output_depths  = output_depths
+    self.tracer         = LatencyTracer() if trace else None # Key to audio latency, per stage
     
     self._init_queue()
+    self._init_handlers()
     self._init_generator()
     self._init_sound_engine()
-    
-    self.note_voice = {}
 
   def _init_queue(self):
     self.input_queue = EventQueue()
 
+  def _init_handlers(self):
+    # Handlers of the midi messages applied by the render thread, by status byte (every channel plays the same patch)
+    self._handlers = [None] * 256
+    for channel in range(16):
+      self._handlers[midi.ST_NOTE_ON | channel] = self._evt_note_on
+      self._handlers[midi.ST_NOTE_OFF | channel] = self._evt_note_off
+
   def _init_generator(self):
-    self.oscilators = [
-      Oscilator(name="Saw 1", waveform=WAVEFORMS['SAWTOOTH']),
-      Oscilator(name="Triangle 1", waveform=WAVEFORMS['TRIANGLE']),
-      Oscilator(name="Sinusoid 1", waveform=WAVEFORMS['SINE']),
-      Oscilator(name="Square 1", waveform=WAVEFORMS['SQUARE']),
-    ]
+    self.oscilators = default_oscilators()
 
   def _init_sound_engine(self):
-    self.player        = Player()
-    self.sampler       = Sampler(log=self.log)
-    self.output_queue  = EventQueue(1)
+    dtype = np.float32 if self.preallocate else np.float64
+
+    self.sampler       = Sampler(num_voices=self.num_voices, steal_policy=self.steal_policy, workers=self.render_workers, preallocate=self.preallocate, dtype=dtype, log=self.log)
+    self.player        = Player(mode=self.output_mode, sample_rate=self.sampler.sample_rate, backend=self.backend, queue_size=self.sampler.sample_size)
+    self.stats         = EngineStats()
+    self.scheduler     = EventScheduler(self.sampler.sample_rate, delay=self.sampler.sample_size)
+    self.tuner         = None
+
+    if self.adaptive:
+      self.tuner       = BlockTuner(self.sampler.sample_size, self.output_depth, self.block_sizes, self.output_depths)
+      self.output_ring = BlockRing(self.tuner.depth, self.tuner.max_block_size, dtype=dtype, capacity=self.tuner.max_depth)
+      self._apply_tuning()
+    else:
+      self.output_ring = BlockRing(self.output_depth, self.sampler.sample_size, dtype=dtype)
     self.stop           = False
     
     self.player_thread  = threading.Thread(name='SyPlayerT', target=self._continuous_play)
@@ -55,37 +85,99 @@ class Synth(object):
     self.queue_thread.start()
 
   def _continuous_sample(self):
-    t = 0
     while not self.stop:
-      sample_size = self.sampler.sample_size
-      sample_rate = self.sampler.sample_rate
-      duration    = sample_size / sample_rate
-      time        = t * duration
+      if not self.output_ring.wait_writable(timeout=0.1):
+        continue
 
-      master = self.sampler.get_master(duration, time)
+      sample_size = self.sampler.sample_size
+      block_time = time.time()
+      
+      buffer_allocations = self.sampler.buffer_allocations
+      start = time.perf_counter()
+      events = self.scheduler.collect(block_time, sample_size)
+      master = self.sampler.get_master_split(sample_size, events, self._dispatch)
+      render_time = time.perf_counter() - start
+
+      self.output_ring.push(master) # An empty block lets the player know the voices went silent
+      if self.tracer:
+        self.tracer.rendered(self.output_ring.write_count - 1)
 
       if len(master) > 0:
-        self.log.debug(f'Putting {len(master)}')
-        self.output_queue.put(master, 'sample')
-        t += 1
+        deadline = len(master) / self.sampler.sample_rate
+        self.stats.record_block(render_time, deadline, self.output_ring.qsize(), self.sampler.buffer_allocations - buffer_allocations)
+        if self.tuner and self.tuner.update(render_time / deadline, self.player.underruns + self.player.output_underflows):
+          self._apply_tuning()
       else:
-        t = 0
+        # Events scheduled for later are collected block by block
+        timeout = sample_size / self.sampler.sample_rate if self.scheduler.pending else None
         with self.sampling_lock:
-          self.sampling_lock.wait()
+          self.sampling_lock.wait_for(self._should_sample, timeout)
     
     self.log.debug("Exited sampler loop.")
 
+  def _should_sample(self):
+    return self.stop or len(self.scheduler.inbox) > 0 or self.sampler.has_voices()
+
   def _continuous_play(self):
     while not self.stop:
+      if not self.output_ring.wait_readable(timeout=1):
+        continue
+
       try:
-        event = self.output_queue.get(timeout=1)
-        master = event.item
-        self.log.debug(f'Sample Queue Size {self.output_queue.qsize()}')
-        self.player.play_sample(master)
-      except Exception as e: pass
+        block = self.output_ring.read_count
+        sample = self.output_ring.read_slot()
+        self.player.play_sample(sample)
+        if self.tracer:
+          self.tracer.played(block, self.player.delay(len(sample)) / self.sampler.sample_rate)
+      except Exception:
+        self.stats.record_error()
+        self.log.exception('Could not play sample')
+      finally:
+        self.output_ring.release()
 
     self.log.debug("Exited player loop.")
 
+  def _apply_tuning(self):
+    """ Switches to the tuner's block size and output depth. Runs on the render thread, between blocks. """
+    self.sampler.sample_size = self.tuner.block_size
+    self.scheduler.delay = self.tuner.block_size
+    self.output_ring.set_depth(self.tuner.depth)
+    self.player.queue_size = self.tuner.block_size # The player ring holds one block on top of the output ring
+    self.log.info(f'Block size {self.tuner.block_size}, output depth {self.tuner.depth}')
+
+  def get_tuning(self):
+    """ Returns the block size and output depth in use, and the latency of the output buffers in milliseconds: at most (buffer_latency_ms), when the output ring and the player's ring are full, and right now (queued_ms). """
+    block_size = self.sampler.sample_size
+    depth = self.output_ring.depth
+    player_queue = self.player.queue_limit()
+    queued = self.output_ring.qsize() * block_size + self.player.queued()
+
+    return {
+      'adaptive': self.tuner is not None,
+      'block_size': block_size,
+      'output_depth': depth,
+      'player_queue': player_queue,
+      'buffer_latency_ms': (block_size * depth + player_queue) / self.sampler.sample_rate * 1000,
+      'queued_ms': queued / self.sampler.sample_rate * 1000,
+      'tuning_changes': self.tuner.changes if self.tuner else 0,
+    }
+
+  def get_stats(self):
+    """ Returns the render loop instrumentation: block render times, deadline misses, DSP load, output queue depth, output underflows and the current block size and output depth (see get_tuning). """
+    stats = self.stats.snapshot(self.player)
+    stats.update(self.get_tuning())
+    return stats
+
+  def get_latency(self):
+    """ Returns the traced latency of each stage from key to audio (see LatencyTracer.snapshot), plus the latency the output stream reports, or None if the synth was not created with trace. """
+    if not self.tracer:
+      return None
+
+    return {
+      'stages': self.tracer.snapshot(),
+      'device_latency_ms': self.player.stream.latency * 1000,
+    }
+
   def terminate(self):
     self.log.debug('Terminating Synth...')
     self.stop = True
@@ -97,6 +189,7 @@ class Synth(object):
     with self.sampling_lock:
       self.sampling_lock.notify()
     self.sampler_thread.join()
+    self.sampler.close()
 
     self.log.debug('Terminating Player...')
     self.player.terminate()
@@ -108,24 +201,21 @@ class Synth(object):
 
   def _evt_note_on(self, item):
     note_number = item.data1
-    freq = midi.midi_number_to_freq(note_number)
+    freq = midi.NOTE_FREQUENCIES[note_number]
     
-    voice_index = self.sampler.allocate_voice((self.oscilators, freq))
-    with self.sampling_lock:
-      self.sampling_lock.notify()
-
-    self.note_voice[note_number] = voice_index
+    voice_index = self.sampler.note_on(note_number, (self.oscilators, freq), item.data2 / 127)
+    if self.tracer:
+      self.tracer.allocated(note_number)
     self.log.debug(f'Processed note_on event: #{note_number}, {freq}Hz, Voice {voice_index}')
   
   def _evt_note_off(self, item):
     note_number = item.data1
-    voice_idx = self.note_voice[note_number]
-    self.sampler.free_voice(voice_idx)
+    voice_idx = self.sampler.note_off(note_number)
     self.log.debug(f'Processed note_off event: #{note_number}, Voice {voice_idx}')
 
-  def _evt_syscom(self, item):
-    if item.data1 == 0 and item.data2 == 0:
-      self.log.debug('Got syscom_exit event.')
+  def _evt_sys(self, item):
+    if item == EXIT_ITEM and not self.stop:
+      self.log.debug('Got exit event.')
       self.terminate()
 
   def process_queue(self):
@@ -135,12 +225,24 @@ class Synth(object):
 
       item = event.item
 
-      if event.type == midi.EVT_MIDI:
-        if item.status == midi.ST_SYS_COM:
-          self._evt_syscom(item)
-        if item.status == midi.ST_NOTE_ON:
-          self._evt_note_on(item)
-        if item.status == midi.ST_NOTE_OFF:
-          self._evt_note_off(item)
+      if event.type == EVT_SYS:
+        self._evt_sys(item)
+      elif event.type == midi.EVT_MIDI:
+        self.schedule(item, event.timestamp, event)
     
     self.log.debug("Exited Event Queue loop.")
+
+  def schedule(self, item, timestamp=None, event=None):
+    """ Queues a midi message to be applied by the render thread on the sample that corresponds to timestamp (a time.time() value), or at the next block if there is none. event is the one that carried item, if any, for latency tracing. """
+    if self.tracer and item.status & 0xF0 == midi.ST_NOTE_ON:
+      self.tracer.begin(item.data1, event, timestamp)
+
+    self.scheduler.schedule(item, timestamp)
+    with self.sampling_lock:
+      self.sampling_lock.notify()
+
+  def _dispatch(self, item):
+    """ Applies a scheduled midi message. Runs on the render thread, between two samples of a block. """
+    handler = self._handlers[item.status]
+    if handler:
+      handler(item)
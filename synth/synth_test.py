@@ -0,0 +1,143 @@
+from unittest import TestCase, main
+
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+from midi import (note_on, note_off, EVT_MIDI, MidiMessage, ST_NOTE_ON, ST_MTC_QUARTER_FRAME)
+from scipy.io import wavfile
+from synth.backends import (NullBackend, FileBackend)
+from synth.event_queue import Event
+from synth.player import (MODE_BLOCKING, MODE_CALLBACK)
+from synth.synth import (Synth, TERMINATE_EVT)
+
+class SynthTest(TestCase):
+  def test_synth_CallbackShouldOnlyWriteThePlayedNotes(self):
+    fd, path = tempfile.mkstemp(suffix='.wav')
+    os.close(fd)
+
+    try:
+      synth = Synth(output_mode=MODE_CALLBACK, backend=FileBackend(path))
+      try:
+        time.sleep(0.2)
+        idle = synth.player.stream.frames
+        synth.input_queue.put(note_on('A', 4, 127), EVT_MIDI)
+        time.sleep(0.2)
+        synth.input_queue.put(note_off('A', 4, 127), EVT_MIDI)
+        time.sleep(0.3)
+        stats = synth.get_stats()
+      finally:
+        synth.terminate()
+
+      _, data = wavfile.read(path)
+    finally:
+      os.remove(path)
+
+    self.assertEqual(idle, 0)
+    self.assertGreater(len(data), 0)
+    self.assertEqual(len(data), stats['blocks'] * synth.sampler.sample_size)
+
+  def test_synth_ShouldPlayThroughTheNullBackend(self):
+    for mode in (MODE_BLOCKING, MODE_CALLBACK):
+      synth = Synth(output_mode=mode, backend=NullBackend(realtime=False))
+      try:
+        synth.input_queue.put(note_on('A', 4, 127), EVT_MIDI)
+        time.sleep(0.2)
+        frames = synth.player.stream.frames
+        stats = synth.get_stats()
+        synth.input_queue.put(note_off('A', 4, 127), EVT_MIDI)
+      finally:
+        synth.terminate()
+
+      self.assertGreater(frames, 0)
+      self.assertGreater(stats['blocks'], 0)
+
+  def test_synth_AdaptiveShouldReportTuning(self):
+    synth = Synth(backend=NullBackend(realtime=False), adaptive=True, block_sizes=(256, 2048))
+    try:
+      synth.input_queue.put(note_on('A', 4, 127), EVT_MIDI)
+      time.sleep(0.2)
+      stats = synth.get_stats()
+    finally:
+      synth.terminate()
+
+    self.assertTrue(stats['adaptive'])
+    self.assertGreater(stats['blocks'], 0)
+    self.assertIn(stats['block_size'], (256, 512, 1024, 2048))
+    self.assertEqual(stats['buffer_latency_ms'], (stats['block_size'] * stats['output_depth'] + stats['player_queue']) / 44100 * 1000)
+    self.assertEqual(synth.player.queue_size, synth.tuner.block_size)
+
+  def test_synth_DispatchShouldPlayEveryChannel(self):
+    synth = Synth(backend=NullBackend(realtime=False))
+    try:
+      synth._dispatch(MidiMessage(ST_NOTE_ON | 5, 69, 100))
+      playing = synth.sampler.has_voices()
+      synth._dispatch(MidiMessage(ST_MTC_QUARTER_FRAME, 0, 0)) # Not a channel message, ignored
+    finally:
+      synth.terminate()
+
+    self.assertTrue(playing)
+
+  def test_synth_MidiSystemMessagesShouldNotStopTheSynth(self):
+    synth = Synth(backend=NullBackend(realtime=False))
+    try:
+      synth.input_queue.put(MidiMessage(ST_MTC_QUARTER_FRAME, 0, 0), EVT_MIDI)
+      synth.input_queue.put(note_on('A', 4, 127), EVT_MIDI)
+      time.sleep(0.1)
+      stopped = synth.stop
+    finally:
+      synth.terminate()
+
+    self.assertFalse(stopped)
+
+  def test_synth_LatencyShouldBeNoneWithoutTracing(self):
+    synth = Synth(backend=NullBackend(realtime=False))
+    synth.terminate()
+
+    self.assertIsNone(synth.get_latency())
+
+  def test_synth_ExitEventShouldStopTheSynth(self):
+    synth = Synth(backend=NullBackend(realtime=False))
+    synth.input_queue.put(TERMINATE_EVT)
+    synth.queue_thread.join(timeout=2)
+
+    self.assertTrue(synth.stop)
+    self.assertFalse(synth.player_thread.is_alive())
+
+  def test_synth_ShouldTraceKeyToAudioLatency(self):
+    synth = Synth(backend=NullBackend(realtime=False), trace=True)
+    try:
+      key = Event('r', 'key_', timestamp=time.time())
+      synth.input_queue.put(Event(note_on('A', 4, 127), EVT_MIDI, ancestor=key, timestamp=time.time()))
+      time.sleep(0.2)
+      latency = synth.get_latency()
+    finally:
+      synth.terminate()
+
+    self.assertEqual(latency['stages']['total']['count'], 1)
+    self.assertEqual(latency['stages']['app_dispatch']['count'], 1)
+
+  def test_synth_PreallocatedShouldNotAllocatePerBlock(self):
+    synth = Synth(backend=NullBackend(realtime=False), preallocate=True)
+    synth.terminate() # Render the blocks here, with nothing else running
+
+    block_size = synth.sampler.sample_size
+    synth._dispatch(note_on('A', 4, 127))
+    synth.sampler.get_master_split(block_size, [], synth._dispatch)
+
+    tracemalloc.start()
+    try:
+      block = synth.sampler.get_master_split(block_size, [], synth._dispatch)
+      peak = tracemalloc.get_traced_memory()[1]
+    finally:
+      tracemalloc.stop()
+
+    self.assertEqual(block.dtype, np.float32)
+    self.assertEqual(synth.output_ring.slots.dtype, np.float32)
+    # Small per voice arrays and Python objects, a single (voices x oscilators x samples) work array would take 16KB
+    self.assertLess(peak, 8 * 1024)
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,125 @@
+import collections
+import json
+import threading
+import time
+import numpy as np
+
+CAPTURE          = 'capture'          # The input saw the key (or byte)
+APP_DISPATCH     = 'app_dispatch'     # The app turned it into a midi event
+SYNTH_DISPATCH   = 'synth_dispatch'   # The synth handed it to the scheduler
+VOICE_ALLOCATION = 'voice_allocation' # The render thread started a voice for it
+FIRST_BLOCK      = 'first_block'      # The first block with the note was rendered and queued
+OUTPUT           = 'output'           # That block reached the output stream, after the samples queued before it
+TOTAL            = 'total'
+
+STAGES = (CAPTURE, APP_DISPATCH, SYNTH_DISPATCH, VOICE_ALLOCATION, FIRST_BLOCK, OUTPUT)
+
+LATENCY_BINS_MS = np.array([0.0, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0, np.inf])
+
+class LatencyTracer(object):
+  """ Follows note on events from input to output and keeps the time spent in each stage.
+
+  Each stage's latency is the time since the previous stage the note went through (the fast keyboard path, for instance, skips the app dispatch). The last history values of every stage are kept, to query percentiles and histograms (see LATENCY_BINS_MS) while running. Timestamps are time.time() values, like the ones of Event. Stamps in the future, such as midi file events queued ahead of time, count as no wait. """
+  def __init__(self, history=1024):
+    self.history = history
+
+    self.latencies = {stage: np.zeros(history) for stage in STAGES[1:] + (TOTAL,)}
+    self.counts    = dict.fromkeys(self.latencies, 0)
+
+    self._lock      = threading.Lock()
+    self._scheduled = collections.defaultdict(collections.deque) # Note -> stamps of its note ons waiting for a voice
+    self._allocated = []                                         # Stamps waiting for their first block
+    self._rendered  = {}                                         # Block sequence number -> stamps waiting for output
+
+  def begin(self, note, event=None, timestamp=None):
+    """ Starts tracing a note on handed to the synth, from event and its ancestors if given, or from the capture timestamp. """
+    now = time.time()
+    stamps = {}
+
+    if event is not None:
+      root = event
+      while root.ancestor is not None:
+        root = root.ancestor
+      stamps[CAPTURE] = root.timestamp
+      if root is not event:
+        stamps[APP_DISPATCH] = event.timestamp
+    else:
+      stamps[CAPTURE] = timestamp
+
+    if stamps[CAPTURE] is None:
+      stamps[CAPTURE] = now
+    stamps[SYNTH_DISPATCH] = now
+
+    with self._lock:
+      self._scheduled[note].append(stamps)
+
+  def allocated(self, note):
+    """ Called by the render thread when a voice starts playing note. """
+    with self._lock:
+      waiting = self._scheduled.get(note)
+      if waiting:
+        stamps = waiting.popleft()
+        stamps[VOICE_ALLOCATION] = time.time()
+        self._allocated.append(stamps)
+
+  def rendered(self, block):
+    """ Called by the render thread once the block with sequence number block is queued for output. """
+    with self._lock:
+      if not self._allocated:
+        return
+
+      now = time.time()
+      for stamps in self._allocated:
+        stamps[FIRST_BLOCK] = now
+      self._rendered[block] = self._allocated
+      self._allocated = []
+
+  def played(self, block, delay=0.0):
+    """ Called by the output thread once it handed the block with sequence number block to the player. delay is how long, in seconds, the stream takes to pull the samples queued before it. """
+    with self._lock:
+      traces = self._rendered.pop(block, None)
+      if not traces:
+        return
+
+      now = time.time() + delay
+      for stamps in traces:
+        stamps[OUTPUT] = now
+        self._record(stamps)
+
+  def _record(self, stamps):
+    previous = stamps[CAPTURE]
+    for stage in STAGES[1:]:
+      if stage in stamps:
+        self._add(stage, max(stamps[stage] - previous, 0.0))
+        previous = max(stamps[stage], previous)
+
+    self._add(TOTAL, max(stamps[OUTPUT] - stamps[CAPTURE], 0.0))
+
+  def _add(self, stage, latency):
+    self.latencies[stage][self.counts[stage] % self.history] = latency
+    self.counts[stage] += 1
+
+  def snapshot(self):
+    """ Returns, per stage, the number of traced notes and the p50, p99 and max latencies, in milliseconds, with a histogram over LATENCY_BINS_MS. """
+    with self._lock:
+      latencies = {stage: values[:min(self.counts[stage], self.history)] * 1000 for stage, values in self.latencies.items()}
+      counts = dict(self.counts)
+
+    return {
+      stage: {
+        'count': counts[stage],
+        'p50_ms': float(np.percentile(values, 50)) if len(values) else 0.0,
+        'p99_ms': float(np.percentile(values, 99)) if len(values) else 0.0,
+        'max_ms': float(values.max()) if len(values) else 0.0,
+        'histogram': np.histogram(values, LATENCY_BINS_MS)[0].tolist(),
+      }
+      for stage, values in latencies.items()
+    }
+
+  def export(self, path, extra=None):
+    """ Writes the snapshot, and the bins it uses, as JSON. """
+    report = {'bins_ms': LATENCY_BINS_MS[:-1].tolist(), 'stages': self.snapshot()}
+    report.update(extra or {})
+
+    with open(path, 'w') as file:
+      json.dump(report, file, indent=2)
@@ -0,0 +1,82 @@
+from unittest import TestCase, main
+
+import os
+import json
+import tempfile
+import time
+
+from synth.event_queue import Event
+from synth.tracer import (LatencyTracer, CAPTURE, APP_DISPATCH, SYNTH_DISPATCH, VOICE_ALLOCATION, FIRST_BLOCK, OUTPUT, TOTAL)
+
+class LatencyTracerTest(TestCase):
+  def _trace(self, tracer, note, event=None, timestamp=None, block=0):
+    tracer.begin(note, event, timestamp)
+    tracer.allocated(note)
+    tracer.rendered(block)
+    tracer.played(block)
+
+  def test_played_ShouldRecordEveryStageOfTheEventChain(self):
+    tracer = LatencyTracer()
+    key = Event('q', 'key_', timestamp=time.time() - 0.010)
+    event = Event(None, 'midi_', ancestor=key, timestamp=time.time() - 0.004)
+
+    self._trace(tracer, 69, event)
+    stages = tracer.snapshot()
+
+    for stage in (APP_DISPATCH, SYNTH_DISPATCH, VOICE_ALLOCATION, FIRST_BLOCK, OUTPUT, TOTAL):
+      self.assertEqual(stages[stage]['count'], 1)
+    self.assertAlmostEqual(stages[APP_DISPATCH]['p50_ms'], 6.0, delta=1.0)
+    self.assertGreaterEqual(stages[TOTAL]['max_ms'], 10.0)
+
+  def test_played_FastPathShouldSkipAppDispatch(self):
+    tracer = LatencyTracer()
+    self._trace(tracer, 69, timestamp=time.time())
+
+    stages = tracer.snapshot()
+    self.assertEqual(stages[APP_DISPATCH]['count'], 0)
+    self.assertEqual(stages[TOTAL]['count'], 1)
+
+  def test_played_ShouldCountTheQueuedDelay(self):
+    tracer = LatencyTracer()
+    tracer.begin(69, timestamp=time.time())
+    tracer.allocated(69)
+    tracer.rendered(0)
+    tracer.played(0, delay=0.05)
+
+    stages = tracer.snapshot()
+    self.assertGreaterEqual(stages[OUTPUT]['p50_ms'], 50.0)
+    self.assertGreaterEqual(stages[TOTAL]['p50_ms'], 50.0)
+
+  def test_rendered_ShouldOnlyStampNotesAllocatedBefore(self):
+    tracer = LatencyTracer()
+    tracer.begin(60, timestamp=time.time())
+    tracer.begin(64, timestamp=time.time())
+    tracer.allocated(60)
+    tracer.rendered(0)
+    tracer.allocated(64)
+    tracer.rendered(1)
+
+    tracer.played(0)
+    self.assertEqual(tracer.snapshot()[TOTAL]['count'], 1)
+    tracer.played(1)
+    self.assertEqual(tracer.snapshot()[TOTAL]['count'], 2)
+
+  def test_export_ShouldWriteJson(self):
+    tracer = LatencyTracer()
+    self._trace(tracer, 69, timestamp=time.time())
+    fd, path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+
+    try:
+      tracer.export(path, {'device_latency_ms': 5.0})
+      with open(path) as file:
+        report = json.load(file)
+    finally:
+      os.remove(path)
+
+    self.assertEqual(report['device_latency_ms'], 5.0)
+    self.assertEqual(report['stages'][TOTAL]['count'], 1)
+    self.assertEqual(len(report['stages'][TOTAL]['histogram']), len(report['bins_ms']))
+
+if __name__ == '__main__':
+  main()
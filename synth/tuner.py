@@ -0,0 +1,45 @@
+import collections
+
+class BlockTuner(object):
+  """ Chooses the render block size and output queue depth from the measured DSP load (render time / deadline of each block).
+
+  A block close to its deadline, or an underrun, makes the tuner grow right away: the block size when the load is high, the depth after an underrun. Once a whole window of blocks stayed under low_load it shrinks again, block size first, for less latency. Values stay within the given (min, max) bounds and block sizes are powers of two times the minimum. """
+  def __init__(self, block_size=1024, depth=2, block_sizes=(128, 4096), depths=(2, 8), high_load=0.7, low_load=0.25, window=64):
+    self.min_block_size, self.max_block_size = block_sizes
+    self.min_depth, self.max_depth = depths
+    self.high_load = high_load
+    self.low_load  = low_load
+
+    self.block_size = min(max(block_size, self.min_block_size), self.max_block_size)
+    self.depth      = min(max(depth, self.min_depth), self.max_depth)
+    self.changes    = 0
+
+    self.loads      = collections.deque(maxlen=window)
+    self.underruns  = 0
+
+  def update(self, load, underruns=0):
+    """ Records the load of one block and the number of underruns so far. Returns True if block_size or depth changed. """
+    self.loads.append(load)
+
+    if underruns > self.underruns:
+      self.underruns = underruns
+      return self._set(self.block_size, self.depth + 1) or self._set(self.block_size * 2, self.depth)
+
+    if load > self.high_load:
+      return self._set(self.block_size * 2, self.depth) or self._set(self.block_size, self.depth + 1)
+
+    if len(self.loads) == self.loads.maxlen and max(self.loads) < self.low_load:
+      return self._set(self.block_size // 2, self.depth) or self._set(self.block_size, self.depth - 1)
+
+    return False
+
+  def _set(self, block_size, depth):
+    if not (self.min_block_size <= block_size <= self.max_block_size and self.min_depth <= depth <= self.max_depth):
+      return False
+
+    self.block_size = block_size
+    self.depth = depth
+    self.changes += 1
+    self.loads.clear() # Measure the new setting before changing again
+
+    return True
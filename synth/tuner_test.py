@@ -0,0 +1,38 @@
+from unittest import TestCase, main
+
+from synth.tuner import BlockTuner
+
+class BlockTunerTest(TestCase):
+  def test_update_HighLoadShouldGrowBlockSize(self):
+    tuner = BlockTuner(block_size=512)
+
+    self.assertTrue(tuner.update(0.9))
+    self.assertEqual(tuner.block_size, 1024)
+    self.assertEqual(tuner.depth, 2)
+
+  def test_update_UnderrunShouldGrowDepth(self):
+    tuner = BlockTuner(block_size=512)
+
+    self.assertTrue(tuner.update(0.1, underruns=1))
+    self.assertEqual(tuner.depth, 3)
+    self.assertFalse(tuner.update(0.1, underruns=1))
+
+  def test_update_HeadroomShouldShrinkAfterAWindow(self):
+    tuner = BlockTuner(block_size=512, depth=3, window=4)
+
+    changes = [tuner.update(0.1) for _ in range(4)]
+    self.assertEqual(changes, [False, False, False, True])
+    self.assertEqual(tuner.block_size, 256)
+
+    for _ in range(8):
+      tuner.update(0.1)
+    self.assertEqual((tuner.block_size, tuner.depth), (128, 2))
+
+  def test_update_ShouldStayWithinBounds(self):
+    tuner = BlockTuner(block_size=4096, depth=8, block_sizes=(128, 4096), depths=(2, 8))
+
+    self.assertFalse(tuner.update(2.0, underruns=1))
+    self.assertEqual((tuner.block_size, tuner.depth), (4096, 8))
+
+if __name__ == '__main__':
+  main()
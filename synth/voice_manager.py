@@ -0,0 +1,97 @@
+from collections import OrderedDict
+import numpy as np
+
+STEAL_OLDEST    = 'oldest'
+STEAL_QUIETEST  = 'quietest'
+STEAL_SAME_NOTE = 'same_note'
+
+STEAL_POLICIES = (STEAL_OLDEST, STEAL_QUIETEST, STEAL_SAME_NOTE)
+
+class VoiceManager(object):
+  """ Hands out voice slots in O(1).
+
+  Free slots are kept in a free list and busy ones in an age ordered active set, plus a dense array of active indices (active_indices[:num_active]) for the renderer. When every slot is busy a voice is stolen according to the policy: the oldest one or the quietest one (lowest level). With same_note, a note that is already playing retriggers its own voice; otherwise it is layered on a new one, and note offs release the voices of a note oldest first. """
+  def __init__(self, num_voices, policy=STEAL_OLDEST):
+    if policy not in STEAL_POLICIES:
+      raise ValueError(f"Unknown voice stealing policy '{policy}'. Expected one of {STEAL_POLICIES}.")
+
+    self.num_voices = num_voices
+    self.policy     = policy
+
+    self.free           = list(range(num_voices - 1, -1, -1)) # Stack, the lowest index is handed out first
+    self.active         = OrderedDict()                       # voice index -> note, oldest first
+    self.note_voices    = {}                                  # note -> voice indexes, oldest first
+    self.active_indices = np.zeros(num_voices, dtype=np.intp)
+    self.num_active     = 0
+    self.levels         = np.zeros(num_voices)                # Loudness of each voice, for STEAL_QUIETEST
+    self._position      = np.zeros(num_voices, dtype=np.intp) # Where each voice is in active_indices
+
+  def get_active(self):
+    """ The indexes of the voices in use, as a view of the dense array. """
+    return self.active_indices[:self.num_active]
+
+  def allocate(self, note=None, level=1.0):
+    """ Returns (voice index, stolen note). The stolen note is the one the voice was playing if it had to be stolen, None otherwise. """
+    stolen_note = None
+
+    if self.policy == STEAL_SAME_NOTE and note in self.note_voices:
+      voice_idx = self.note_voices[note][0]
+      stolen_note = note
+      self.release(voice_idx)
+    elif not self.free:
+      voice_idx = self._victim()
+      stolen_note = self.active[voice_idx]
+      self.release(voice_idx)
+
+    voice_idx = self.free.pop()
+    self.active[voice_idx] = note
+    if note is not None:
+      self.note_voices.setdefault(note, []).append(voice_idx)
+
+    self.active_indices[self.num_active] = voice_idx
+    self._position[voice_idx] = self.num_active
+    self.num_active += 1
+    self.levels[voice_idx] = level
+
+    return voice_idx, stolen_note
+
+  def _victim(self):
+    if self.policy == STEAL_QUIETEST:
+      active = self.get_active()
+      return int(active[np.argmin(self.levels[active])])
+
+    return next(iter(self.active))
+
+  def release(self, voice_idx):
+    """ Gives a voice back to the free list. Does nothing if it is not in use. """
+    if voice_idx not in self.active:
+      return
+
+    self.detach(voice_idx)
+    del self.active[voice_idx]
+
+    # Move the last active voice into the freed position of the dense array
+    position = self._position[voice_idx]
+    self.num_active -= 1
+    last = self.active_indices[self.num_active]
+    self.active_indices[position] = last
+    self._position[last] = position
+
+    self.free.append(voice_idx)
+
+  def detach(self, voice_idx):
+    """ Unmaps a voice from its note, e.g. when the note is released but the voice keeps sounding. It stays active until released. """
+    note = self.active.get(voice_idx)
+    if note is None:
+      return
+
+    self.active[voice_idx] = None
+    voices = self.note_voices[note]
+    voices.remove(voice_idx)
+    if not voices:
+      del self.note_voices[note]
+
+  def voice_of(self, note):
+    """ The oldest voice playing note, or None. """
+    voices = self.note_voices.get(note)
+    return voices[0] if voices else None
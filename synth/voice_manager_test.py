@@ -0,0 +1,72 @@
+from unittest import TestCase, main
+
+from synth.voice_manager import (VoiceManager, STEAL_OLDEST, STEAL_QUIETEST, STEAL_SAME_NOTE)
+
+class VoiceManagerTest(TestCase):
+  def _fill(self, manager, notes, levels=None):
+    levels = levels or [1.0] * len(notes)
+    return [manager.allocate(note, level)[0] for note, level in zip(notes, levels)]
+
+  def test_allocate_ShouldHandOutEveryVoiceOnce(self):
+    manager = VoiceManager(4)
+
+    voices = self._fill(manager, [60, 61, 62, 63])
+
+    self.assertEqual(sorted(voices), [0, 1, 2, 3])
+    self.assertEqual(sorted(manager.get_active()), [0, 1, 2, 3])
+
+  def test_allocate_FullShouldStealTheOldestVoice(self):
+    manager = VoiceManager(3, STEAL_OLDEST)
+    voices = self._fill(manager, [60, 61, 62])
+
+    voice_idx, stolen_note = manager.allocate(63)
+
+    self.assertEqual(voice_idx, voices[0])
+    self.assertEqual(stolen_note, 60)
+    self.assertIsNone(manager.voice_of(60))
+    self.assertEqual(manager.voice_of(63), voices[0])
+
+  def test_allocate_FullShouldStealTheQuietestVoice(self):
+    manager = VoiceManager(3, STEAL_QUIETEST)
+    voices = self._fill(manager, [60, 61, 62], [0.9, 0.1, 0.5])
+
+    voice_idx, stolen_note = manager.allocate(63)
+
+    self.assertEqual(voice_idx, voices[1])
+    self.assertEqual(stolen_note, 61)
+
+  def test_allocate_SameNoteShouldRetriggerItsVoice(self):
+    manager = VoiceManager(4, STEAL_SAME_NOTE)
+    voices = self._fill(manager, [60, 61])
+
+    voice_idx, stolen_note = manager.allocate(60)
+
+    self.assertEqual(voice_idx, voices[0])
+    self.assertEqual(stolen_note, 60)
+    self.assertEqual(manager.num_active, 2)
+
+  def test_allocate_RepeatedNoteShouldBeLayeredAndReleasedOldestFirst(self):
+    manager = VoiceManager(4, STEAL_OLDEST)
+    first, second = self._fill(manager, [60, 60])
+
+    self.assertEqual(manager.voice_of(60), first)
+    manager.release(first)
+    self.assertEqual(manager.voice_of(60), second)
+
+  def test_release_ShouldKeepActiveIndicesDense(self):
+    manager = VoiceManager(4)
+    voices = self._fill(manager, [60, 61, 62, 63])
+
+    manager.release(voices[1])
+    manager.release(voices[1])
+
+    self.assertEqual(manager.num_active, 3)
+    self.assertEqual(sorted(manager.get_active()), sorted([voices[0], voices[2], voices[3]]))
+    self.assertEqual(manager.allocate(64)[0], voices[1])
+
+  def test_init_UnknownPolicyShouldRaise(self):
+    with self.assertRaises(ValueError):
+      VoiceManager(4, 'loudest')
+
+if __name__ == "__main__":
+  main()
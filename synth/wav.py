@@ -0,0 +1,59 @@
+import struct
+import numpy as np
+
+WAVE_FORMAT_IEEE_FLOAT = 3
+
+class WavWriter(object):
+  """ Streams float32 samples into an IEEE float WAV file. The header sizes are patched on close(). """
+  def __init__(self, path, sample_rate=44100, channels=1):
+    self.path = path
+    self.sample_rate = sample_rate
+    self.channels = channels
+    self.frames = 0
+
+    self.file = open(path, 'wb')
+    self._write_header()
+
+  def _write_header(self):
+    bytes_per_sample = 4
+    data_size = self.frames * self.channels * bytes_per_sample
+    
+    self.file.write(b'RIFF')
+    self.file.write(struct.pack('<I', 4 + 26 + 12 + 8 + data_size))
+    self.file.write(b'WAVE')
+    self.file.write(b'fmt ')
+    self.file.write(struct.pack(
+      '<IHHIIHHH',
+      18,
+      WAVE_FORMAT_IEEE_FLOAT,
+      self.channels,
+      self.sample_rate,
+      self.sample_rate * self.channels * bytes_per_sample,
+      self.channels * bytes_per_sample,
+      8 * bytes_per_sample,
+      0
+    ))
+    self.file.write(b'fact')
+    self.file.write(struct.pack('<II', 4, self.frames))
+    self.file.write(b'data')
+    self.file.write(struct.pack('<I', data_size))
+
+  def write(self, block):
+    """ Appends block, with shape (frames,) or (frames, channels). """
+    data = np.asarray(block, dtype='<f4')
+    self.file.write(data.tobytes())
+    self.frames += len(data)
+
+  def close(self):
+    if self.file.closed:
+      return
+
+    self.file.seek(0)
+    self._write_header()
+    self.file.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
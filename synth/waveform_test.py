@@ -0,0 +1,79 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from synth.parameter import Parameter
+from synth.parameter_bank import ParameterBank
+from synth.waveform import (WaveForm, WAVEFORMS, interpolate, sawtooth, square)
+
+class WaveFormTest(TestCase):
+  def test_lookup_SineShouldMatchFunction(self):
+    cycles = np.linspace(0, 3, 1000)
+
+    expected = np.sin(2 * np.pi * cycles)
+    actual = WAVEFORMS['SINE'].lookup(cycles)
+
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+  def test_lookup_TriangleShouldMatchFunction(self):
+    waveform = WAVEFORMS['TRIANGLE']
+    cycles = np.linspace(0, 2, 1000)
+
+    expected = waveform(2 * np.pi * cycles)
+    actual = waveform.lookup(cycles)
+
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+  def test_table_ShouldBeCachedWhileParametersDoNotChange(self):
+    waveform = WaveForm(np.sin)
+
+    self.assertIs(waveform.table(), waveform.table())
+
+  def test_table_ShouldBeRebuiltWhenAParameterChanges(self):
+    duty = Parameter('duty', init_value=0.5)
+    waveform = WaveForm(lambda t, duty: np.where(np.mod(t, 2 * np.pi) < 2 * np.pi * duty, 1.0, -1.0), {'duty': duty})
+
+    first = waveform.table()
+    duty.set_relative(0.25)
+    second = waveform.table()
+
+    self.assertIsNot(first, second)
+    self.assertEqual(np.count_nonzero(second[:-1] > 0), waveform.table_size // 4)
+
+  def test_table_ShouldOnlyChangeOnBankSnapshots(self):
+    duty = Parameter('duty', init_value=0.5)
+    waveform = WaveForm(square, {'duty': duty})
+    bank = ParameterBank()
+    bank.indexes(waveform.shape_parameters())
+    bank.snapshot()
+
+    first = waveform.table()
+    duty.set_relative(0.25)
+    self.assertIs(waveform.table(), first)
+
+    bank.snapshot()
+    self.assertEqual(np.count_nonzero(waveform.table()[:-1] > 0), waveform.table_size // 4)
+
+  def test_sawtooth_ShouldMatchScipy(self):
+    from scipy import signal
+    t = np.linspace(-10, 10, 5001)
+
+    for width in (0.0, 0.25, 0.5, 1.0):
+      np.testing.assert_allclose(sawtooth(t, width), signal.sawtooth(t, width), atol=1e-12)
+
+  def test_square_ShouldMatchScipy(self):
+    from scipy import signal
+    t = np.linspace(-10, 10, 5001)
+
+    for duty in (0.0, 0.1, 0.5, 1.0):
+      np.testing.assert_array_equal(square(t, duty), signal.square(t, duty))
+
+  def test_interpolate_ShouldWrapNegativeAndLargePhases(self):
+    table = np.array([0.0, 1.0, 0.0, -1.0, 0.0])
+
+    actual = interpolate(table, np.array([-0.75, 1.25, 2.125, -1e-20]))
+
+    np.testing.assert_allclose(actual, [1.0, 1.0, 0.5, 0.0])
+
+if __name__ == "__main__":
+  main()